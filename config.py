@@ -1,84 +1,173 @@
 """
 配置文件模块
 用于管理项目的配置信息
+
+环境变量只在首次访问配置项时解析一次（``settings()`` 带缓存），
+原有的 ``from config import X`` 写法通过模块级 ``__getattr__`` 保持兼容。
 """
+import logging
 import os
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime
+from typing import Dict
 from dotenv import load_dotenv
 
-# 加载环境变量
-load_dotenv()
+try:
+    # 部署时由 scripts/compile_env.py 根据 .env 预先生成，存在时不再解析 .env 文件
+    from _compiled_env import ENV as _COMPILED_ENV
+except ImportError:
+    _COMPILED_ENV = None
+
+logger = logging.getLogger(__name__)
 
 # 基础路径配置
 BASE_DIR = Path(__file__).parent.parent
 SESSION_DIR = BASE_DIR / 'session'
 DOWNLOAD_DIR = BASE_DIR / 'downloads'
-
-# 确保目录存在
-SESSION_DIR.mkdir(exist_ok=True)
-DOWNLOAD_DIR.mkdir(exist_ok=True)
+# 持久化浏览器配置目录（create_playwright_session(persistent=True) 使用）
+BROWSER_PROFILE_DIR = SESSION_DIR / 'profile'
 
 # 登录配置
 LOGIN_URL = 'https://account.aliyun.com/login/login.htm'
 
-# 阿里云登录凭据（可选，如果使用自动登录）
-ALIYUN_USERNAME = os.getenv('ALIYUN_USERNAME', '')
-ALIYUN_PASSWORD = os.getenv('ALIYUN_PASSWORD', '')
-
-# SSO登录凭据（用于 login_module.py，可选）
-SSO_USERNAME = os.getenv('SSO_USERNAME', '')
-SSO_PASSWORD = os.getenv('SSO_PASSWORD', '')
-
-# SLS OSS访问日志配置
-# region配置：从环境变量读取，例如 'zhangjiakou-2', 'beijing' 等
-SLS_OSS_LOG_REGION = os.getenv('SLS_OSS_LOG_REGION', 'zjk')
-# 如果直接设置了 SLS_OSS_LOG_URL，则使用直接设置的URL
-# 否则根据 region 动态构建URL
-SLS_OSS_LOG_URL = os.getenv('SLS_OSS_LOG_URL', '')
-if not SLS_OSS_LOG_URL:
-    SLS_OSS_LOG_URL = f'https://sls.console.aliyun.com/lognext/project/oss-access-log-{SLS_OSS_LOG_REGION}/logsearch/apache_nginx_user_defined?slsRegion=cn-zhangjiakou-2'
-# SLS日志下载任务页面URL
-
-# 下载配置
-DOWNLOAD_MINUTES = int(os.getenv('DOWNLOAD_MINUTES', 1))  # 默认下载最近43200分钟（30天）的日志
-DOWNLOAD_DIR_PATH = Path(os.getenv('DOWNLOAD_DIR', str(DOWNLOAD_DIR)))
-# 时间范围配置：标准时间格式，例如 '2026-01-11 15:58:36 ~ 2026-01-11 16:13:36'
-# 如果设置了 TIME_RANGE，则优先使用 TIME_RANGE，忽略 DOWNLOAD_MINUTES
-TIME_RANGE = os.getenv('TIME_RANGE', '').strip()  # 时间范围字符串，格式：'YYYY-MM-DD HH:MM:SS ~ YYYY-MM-DD HH:MM:SS'
-print(TIME_RANGE)
-# 查询配置
-QUERY_STATEMENT = os.getenv('QUERY_STATEMENT', 'bucket:shenyu111')  # 默认查询语句，可通过环境变量修改
-
-# 会话配置
-SESSION_FILE = os.getenv('SESSION_FILE', 'aliyun_session.json')
-SESSION_PATH = SESSION_DIR / SESSION_FILE
-# Playwright 的 storage_state 文件路径（统一保存到 session/ 目录）
-STORAGE_STATE_FILE = os.getenv('STORAGE_STATE_FILE', 'storage_state.json')
-STORAGE_STATE_PATH = SESSION_DIR / STORAGE_STATE_FILE
-
-# 浏览器配置
-HEADLESS = os.getenv('HEADLESS', 'False').lower() == 'true'
-BROWSER_TIMEOUT = int(os.getenv('BROWSER_TIMEOUT', 60000))  # 毫秒
-# 浏览器类型（'chromium'、'firefox'、'webkit'）
-BROWSER_TYPE = os.getenv('BROWSER_TYPE', 'chromium')  # 默认使用 chromium
-# 浏览器渠道（'chrome'、'msedge'、'chrome-beta'、'chrome-dev'，None则使用Playwright自带的浏览器）
-BROWSER_CHANNEL = os.getenv('BROWSER_CHANNEL', 'msedge')  # 默认使用 Edge
-
 # 日志配置
-LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
-LOG_DIR = BASE_DIR / 'logs'  # 日志文件目录
-LOG_DIR.mkdir(parents=True, exist_ok=True)  # 确保日志目录存在
+LOG_DIR = BASE_DIR / 'logs'  # 日志文件目录（首次使用时通过 ensure_dir 创建）
 
 # 按日期生成日志文件名（格式：YYYY-MM-DD.log）
 LOG_FILE = datetime.now().strftime('%Y-%m-%d.log')
 LOG_PATH = LOG_DIR / LOG_FILE
 
 # DashScope API配置（用于browser-use）
-DASHSCOPE_API_KEY = os.getenv('DASHSCOPE_API_KEY', '')
 DASHSCOPE_BASE_URL = 'https://dashscope.aliyuncs.com/compatible-mode/v1'
-DASHSCOPE_MODEL = os.getenv('DASHSCOPE_MODEL', 'qwen-vl-max-latest')
 
-# 短信签名查询配置
-SMS_PID = os.getenv('SMS_PID', '')  # 客户PID
-SMS_SIGN_NAME = os.getenv('SMS_SIGN_NAME', '')  # 签名名称
\ No newline at end of file
+
+@lru_cache(maxsize=None)
+def ensure_dir(path: Path) -> Path:
+    """
+    确保目录存在（每个路径只检查/创建一次，导入 config 时不再创建任何目录）
+
+    Args:
+        path: 目录路径
+
+    Returns:
+        Path: 传入的目录路径
+    """
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+@dataclass(frozen=True)
+class Settings:
+    """从环境变量解析出的配置项（只读）"""
+
+    # 阿里云登录凭据（可选，如果使用自动登录）
+    ALIYUN_USERNAME: str
+    ALIYUN_PASSWORD: str
+    # SSO登录凭据（用于 login_module.py，可选）
+    SSO_USERNAME: str
+    SSO_PASSWORD: str
+    # SLS OSS访问日志配置
+    SLS_OSS_LOG_REGION: str
+    SLS_OSS_LOG_URL: str
+    # 下载配置
+    DOWNLOAD_MINUTES: int
+    DOWNLOAD_DIR_PATH: Path
+    TIME_RANGE: str
+    # 查询配置
+    QUERY_STATEMENT: str
+    # 会话配置
+    SESSION_FILE: str
+    SESSION_PATH: Path
+    STORAGE_STATE_FILE: str
+    STORAGE_STATE_PATH: Path
+    # 浏览器配置
+    HEADLESS: bool
+    BROWSER_TIMEOUT: int
+    BROWSER_TYPE: str
+    BROWSER_CHANNEL: str
+    BROWSER_PERSISTENT: bool
+    # 日志配置
+    LOG_LEVEL: str
+    SMS_DEBUG: bool
+    # DashScope API配置
+    DASHSCOPE_API_KEY: str
+    DASHSCOPE_MODEL: str
+    # 短信签名查询配置
+    SMS_PID: str
+    SMS_SIGN_NAME: str
+
+
+@lru_cache(maxsize=1)
+def settings() -> Settings:
+    """
+    加载 .env 并解析所有配置项（每个进程只执行一次）
+
+    Returns:
+        Settings: 配置对象
+    """
+    # 优先使用预编译的 .env（与 load_dotenv() 一致：已存在的环境变量优先）
+    if _COMPILED_ENV is not None:
+        env = dict(_COMPILED_ENV)
+        env.update(os.environ)
+        return _build_settings(env)
+    # 加载环境变量（部署环境由外部注入环境变量时，可设置 CONFIG_SKIP_DOTENV=1 跳过读取 .env 文件）
+    if not os.environ.get('CONFIG_SKIP_DOTENV'):
+        load_dotenv()
+    return _build_settings(os.environ.copy())
+
+
+def _build_settings(env: Dict[str, str]) -> Settings:
+    """根据环境变量快照构建配置对象"""
+    # region配置：从环境变量读取，例如 'zhangjiakou-2', 'beijing' 等
+    sls_oss_log_region = env.get('SLS_OSS_LOG_REGION', 'zjk')
+    # 如果直接设置了 SLS_OSS_LOG_URL，则使用直接设置的URL
+    # 否则根据 region 动态构建URL
+    sls_oss_log_url = env.get('SLS_OSS_LOG_URL', '')
+    if not sls_oss_log_url:
+        sls_oss_log_url = f'https://sls.console.aliyun.com/lognext/project/oss-access-log-{sls_oss_log_region}/logsearch/apache_nginx_user_defined?slsRegion=cn-zhangjiakou-2'
+
+    # 时间范围配置：标准时间格式，例如 '2026-01-11 15:58:36 ~ 2026-01-11 16:13:36'
+    # 如果设置了 TIME_RANGE，则优先使用 TIME_RANGE，忽略 DOWNLOAD_MINUTES
+    time_range = env.get('TIME_RANGE', '').strip()
+    logger.debug("TIME_RANGE=%s", time_range)
+
+    session_file = env.get('SESSION_FILE', 'aliyun_session.json')
+    # Playwright 的 storage_state 文件路径（统一保存到 session/ 目录）
+    storage_state_file = env.get('STORAGE_STATE_FILE', 'storage_state.json')
+
+    return Settings(
+        ALIYUN_USERNAME=env.get('ALIYUN_USERNAME', ''),
+        ALIYUN_PASSWORD=env.get('ALIYUN_PASSWORD', ''),
+        SSO_USERNAME=env.get('SSO_USERNAME', ''),
+        SSO_PASSWORD=env.get('SSO_PASSWORD', ''),
+        SLS_OSS_LOG_REGION=sls_oss_log_region,
+        SLS_OSS_LOG_URL=sls_oss_log_url,
+        DOWNLOAD_MINUTES=int(env.get('DOWNLOAD_MINUTES', 1)),  # 默认下载最近43200分钟（30天）的日志
+        DOWNLOAD_DIR_PATH=Path(env.get('DOWNLOAD_DIR', str(DOWNLOAD_DIR))),
+        TIME_RANGE=time_range,
+        QUERY_STATEMENT=env.get('QUERY_STATEMENT', 'bucket:shenyu111'),  # 默认查询语句，可通过环境变量修改
+        SESSION_FILE=session_file,
+        SESSION_PATH=SESSION_DIR / session_file,
+        STORAGE_STATE_FILE=storage_state_file,
+        STORAGE_STATE_PATH=SESSION_DIR / storage_state_file,
+        HEADLESS=env.get('HEADLESS', 'False').lower() == 'true',
+        BROWSER_TIMEOUT=int(env.get('BROWSER_TIMEOUT', 60000)),  # 毫秒
+        BROWSER_TYPE=env.get('BROWSER_TYPE', 'chromium'),  # 'chromium'、'firefox'、'webkit'
+        BROWSER_CHANNEL=env.get('BROWSER_CHANNEL', 'msedge'),  # 'chrome'、'msedge' 等，默认使用 Edge
+        BROWSER_PERSISTENT=env.get('BROWSER_PERSISTENT', 'False').lower() == 'true',  # 是否使用持久化浏览器配置目录
+        LOG_LEVEL=env.get('LOG_LEVEL', 'INFO'),
+        SMS_DEBUG=env.get('SMS_DEBUG', 'False').lower() in ('true', '1'),  # 是否输出SLS iframe元素等调试信息
+        DASHSCOPE_API_KEY=env.get('DASHSCOPE_API_KEY', ''),
+        DASHSCOPE_MODEL=env.get('DASHSCOPE_MODEL', 'qwen-vl-max-latest'),
+        SMS_PID=env.get('SMS_PID', ''),  # 客户PID
+        SMS_SIGN_NAME=env.get('SMS_SIGN_NAME', ''),  # 签名名称
+    )
+
+
+def __getattr__(name: str):
+    """兼容 ``from config import SMS_PID`` 等旧写法，转发到缓存的 settings()"""
+    if name in Settings.__dataclass_fields__:
+        return getattr(settings(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -4,12 +4,32 @@
 import asyncio
 import os
 from pathlib import Path
-from playwright.async_api import Page, BrowserContext
-from config import SSO_USERNAME, SSO_PASSWORD, SESSION_PATH
+from playwright.async_api import Page, BrowserContext, Route, TimeoutError as PlaywrightTimeoutError, async_playwright
+from config import SSO_USERNAME, SSO_PASSWORD, SESSION_PATH, BROWSER_PROFILE_DIR, ensure_dir
 from session_manager import SessionManager
+from utils import install_xhr_tracker
 
-# 确保 session 目录存在
-SESSION_PATH.parent.mkdir(parents=True, exist_ok=True)
+# SSO 登录地址及登录成功后写入的会话 Cookie 名称
+SSO_LOGIN_URL = "https://login.alibaba-inc.com/ssoLogin.htm"
+SSO_SESSION_COOKIE = "SSO_LOGIN_TOKEN"
+
+# 查询流程不需要的资源类型（block_resources=True 时直接中止这些请求）
+_BLOCKED_RESOURCE_TYPES = frozenset({'image', 'media', 'font'})
+
+# get_page() 复用的已登录会话 (playwright, browser, context, page)，首次调用时创建，close_pool() 时关闭
+_pooled_session = None
+# 保护 _pooled_session 的锁，首次使用时在当前事件循环中创建（导入模块时不依赖事件循环）
+_pool_lock = None
+# 上下文意外关闭后在后台执行的会话清理任务（保留引用，避免任务在完成前被回收）
+_cleanup_tasks = set()
+
+
+async def _abort_blocked_resources(route: Route):
+    """中止图片、媒体和字体请求，其余请求照常发出"""
+    if route.request.resource_type in _BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
 
 
 async def perform_login(page: Page, x_name: str, x_password: str):
@@ -21,31 +41,26 @@ async def perform_login(page: Page, x_name: str, x_password: str):
         x_name: 用户名
         x_password: 密码
     """
-    await page.goto("https://login.alibaba-inc.com/ssoLogin.htm", timeout=60000)
+    await page.goto(SSO_LOGIN_URL, timeout=60000)
 
-    # 填写用户名和密码
-    await page.fill("#account", x_name)
-    await asyncio.sleep(0.5)  # 等待一下，模拟人类操作
-    await page.fill("#password", x_password)
+    # 填写用户名和密码（locator 操作会自动等待元素可操作，无需固定延时）
+    await page.locator("#account").fill(x_name)
+    await page.locator("#password").fill(x_password)
 
     # 提交登录表单
-    await page.click("button:has-text('登 录')")
-
-    # 等待跳转或加载完成
-    await asyncio.sleep(1)
+    await page.locator("button:has-text('登 录')").click()
 
-    # 可选：等待某个登录成功标志出现
+    # 等待登录成功标志出现（以实际跳转结果作为同步信号）
     try:
         await page.wait_for_selector("h2:has-text('Welcome')", timeout=10000)
-    except Exception:
+    except PlaywrightTimeoutError:
         # 如果找不到欢迎信息，也可能登录成功，继续执行
         pass
 
-    # 保存会话状态到 session/ 目录，使用 SessionManager 统一格式
-    session_manager = SessionManager(SESSION_PATH)
-    context = page.context
-    storage_state = await context.storage_state()
-    session_manager.save_session(storage_state)
+    # 由 Playwright 直接将 storage_state 写入 session/ 目录，再记录保存时间
+    ensure_dir(SESSION_PATH.parent)
+    await page.context.storage_state(path=str(SESSION_PATH))
+    SessionManager(SESSION_PATH).mark_saved()
 
 
 async def is_logged_in(page: Page) -> bool:
@@ -58,12 +73,17 @@ async def is_logged_in(page: Page) -> bool:
     Returns:
         bool: 是否已登录
     """
-    await page.goto("https://login.alibaba-inc.com/ssoLogin.htm", timeout=60000)
+    # 先检查上下文中是否已有 SSO 会话 Cookie（已过期的 Cookie 不会返回），命中时无需打开登录页
+    cookies = await page.context.cookies(SSO_LOGIN_URL)
+    if any(cookie['name'] == SSO_SESSION_COOKIE for cookie in cookies):
+        return True
+    
+    await page.goto(SSO_LOGIN_URL, timeout=60000)
     try:
         # 尝试查找登录后的用户信息元素
         user_element = await page.wait_for_selector("h2:has-text('Welcome')", timeout=5000)
         return user_element is not None
-    except Exception:
+    except PlaywrightTimeoutError:
         return False
 
 
@@ -92,7 +112,9 @@ async def create_playwright_session(
     browser_type: str = 'chromium',
     browser_channel: str = None,
     headless: bool = False,
-    viewport: dict = None
+    viewport: dict = None,
+    persistent: bool = False,
+    block_resources: bool = False
 ):
     """
     创建一个已登录的 Playwright 会话（使用纯 Playwright，不依赖 browser-use）
@@ -104,6 +126,11 @@ async def create_playwright_session(
         browser_channel: 浏览器渠道（如 'msedge', 'chrome'）
         headless: 是否无头模式
         viewport: 浏览器窗口尺寸，格式为 {'width': int, 'height': int}，默认 {'width': 1280, 'height': 1100}
+        persistent: 是否使用持久化浏览器配置目录（session/profile）。为True时登录状态直接保存在
+                    浏览器配置目录中，不再读取和验证会话文件；此时没有独立的 Browser 对象，
+                    返回值中的 browser 与 context 为同一对象（close() 可重复调用）
+        block_resources: 是否拦截图片、媒体和字体请求以减少页面加载的数据量。
+                         注意 Playwright 启用请求拦截后会禁用 HTTP 缓存
         
     Returns:
         tuple: (playwright, browser, context, page) - Playwright 对象、浏览器、上下文和页面
@@ -124,9 +151,6 @@ async def create_playwright_session(
             "或者通过函数参数传入用户名和密码。"
         )
     
-    from playwright.async_api import async_playwright
-    import tempfile
-    
     # 启动 Playwright
     playwright = await async_playwright().start()
     
@@ -143,24 +167,49 @@ async def create_playwright_session(
     if browser_channel:
         launch_options['channel'] = browser_channel
     
+    # 设置默认 viewport 尺寸
+    if viewport is None:
+        viewport = {'width': 1280, 'height': 1100}
+    
+    if persistent:
+        # 持久化上下文：cookies/localStorage 保存在浏览器配置目录中，无需会话文件的读写
+        context = await browser_launcher.launch_persistent_context(
+            user_data_dir=str(ensure_dir(BROWSER_PROFILE_DIR)),
+            viewport=viewport,
+            ignore_https_errors=True,
+            **launch_options
+        )
+        if block_resources:
+            await context.route("**/*", _abort_blocked_resources)
+        await install_xhr_tracker(context)
+        page = context.pages[0] if context.pages else await context.new_page()
+        await ensure_logged_in(page, x_name, x_password)
+        return playwright, context, context, page
+    
     # 启动浏览器
     browser = await browser_launcher.launch(**launch_options)
     
-    # 使用 SessionManager 加载会话（带24小时验证）
+    # 使用 SessionManager 验证会话（带24小时验证）
+    # Playwright 原生格式的会话文件直接传路径，无需在 Python 侧解析再序列化；旧格式回退为加载字典
     session_manager = SessionManager(SESSION_PATH)
-    storage_state = session_manager.get_storage_state(max_age_hours=24)
-    
-    # 设置默认 viewport 尺寸
-    if viewport is None:
-        viewport = {'width': 1280, 'height': 1100}
+    storage_state = (
+        session_manager.get_storage_state_path(max_age_hours=24)
+        or session_manager.get_storage_state(max_age_hours=24)
+    )
     
     # 创建浏览器上下文（使用指定尺寸）
     context = await browser.new_context(
         viewport=viewport,  # 设置浏览器窗口尺寸
-        storage_state=storage_state,  # 如果会话有效，使用会话
+        storage_state=storage_state,  # 如果会话有效，使用会话（文件路径或字典）
         ignore_https_errors=True,  # 对应 disable_security=True
     )
     
+    if block_resources:
+        await context.route("**/*", _abort_blocked_resources)
+    
+    # 统计页面内的 XHR/fetch 请求，查询流程据此等待请求完成，而不是固定等待
+    await install_xhr_tracker(context)
+    
     # 创建新页面
     page = await context.new_page()
 
@@ -170,6 +219,78 @@ async def create_playwright_session(
     return playwright, browser, context, page
 
 
+async def get_page(**session_kwargs) -> Page:
+    """
+    从共享的已登录会话中创建一个新页面（浏览器只在首次调用时启动并登录，之后的调用直接复用）
+    
+    适用于在同一进程中多次执行查询的调用方（如常驻服务），避免每次查询都重新启动浏览器和登录。
+    每次查询使用完页面后应调用 page.close()；进程退出前调用 close_pool() 关闭浏览器。
+    
+    Args:
+        **session_kwargs: 首次创建会话时传给 create_playwright_session 的参数（会话已存在时忽略）
+        
+    Returns:
+        Page: 新创建的页面
+    """
+    global _pooled_session
+    async with _get_pool_lock():
+        if _pooled_session is None:
+            session = await create_playwright_session(**session_kwargs)
+            # 浏览器上下文被关闭（如浏览器崩溃或被手动关闭）后，清理该会话，下次调用时重新创建
+            session[2].on('close', lambda _: _discard_pooled_session(session))
+            _pooled_session = session
+        context = _pooled_session[2]
+    return await context.new_page()
+
+
+def _get_pool_lock() -> asyncio.Lock:
+    """获取共享会话的锁（首次调用时创建）"""
+    global _pool_lock
+    if _pool_lock is None:
+        _pool_lock = asyncio.Lock()
+    return _pool_lock
+
+
+async def _close_session(session):
+    """依次关闭会话的浏览器上下文、浏览器和 Playwright"""
+    playwright, browser, context, _ = session
+    await context.close()
+    if browser is not context:
+        await browser.close()
+    await playwright.stop()
+
+
+async def _cleanup_closed_session(session):
+    """上下文意外关闭后关闭浏览器并停止 Playwright（浏览器可能已退出，清理失败时只输出提示）"""
+    try:
+        await _close_session(session)
+    except Exception as e:
+        print(f"清理已关闭的浏览器会话失败: {e}")
+
+
+def _discard_pooled_session(session):
+    """丢弃已关闭的共享会话，并在后台关闭其浏览器和 Playwright"""
+    global _pooled_session
+    # close_pool() 已先行移除并自行关闭该会话时不再重复清理
+    if _pooled_session is not session:
+        return
+    _pooled_session = None
+    task = asyncio.ensure_future(_cleanup_closed_session(session))
+    _cleanup_tasks.add(task)
+    task.add_done_callback(_cleanup_tasks.discard)
+
+
+async def close_pool():
+    """关闭 get_page() 使用的共享会话（浏览器上下文、浏览器和 Playwright），未创建时不做任何操作"""
+    global _pooled_session
+    async with _get_pool_lock():
+        if _pooled_session is None:
+            return
+        session = _pooled_session
+        _pooled_session = None
+        await _close_session(session)
+
+
 if __name__ == '__main__':
     # 示例：使用默认凭据创建已登录的会话
     async def main():
@@ -0,0 +1,46 @@
+"""
+.env 预编译脚本
+将 .env 文件解析一次并生成 Python 模块 _compiled_env.py，
+部署后 config.py 直接导入该模块（由 .pyc 缓存加速），不再在每次启动时解析 .env
+
+用法：
+    python scripts/compile_env.py [.env路径] [输出路径]
+"""
+import sys
+from pathlib import Path
+
+from dotenv import dotenv_values
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+def compile_env(env_path: Path, output_path: Path) -> int:
+    """
+    解析 .env 文件并生成包含 ENV 字典的 Python 模块
+
+    Args:
+        env_path: .env 文件路径
+        output_path: 生成的 Python 模块路径
+
+    Returns:
+        int: 写入的环境变量数量
+    """
+    values = {key: value for key, value in dotenv_values(env_path).items() if value is not None}
+    lines = [
+        '"""由 scripts/compile_env.py 根据 .env 自动生成，请勿手动修改"""',
+        'ENV = {',
+    ]
+    lines.extend(f'    {key!r}: {value!r},' for key, value in values.items())
+    lines.append('}')
+    output_path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    return len(values)
+
+
+if __name__ == '__main__':
+    env_path = Path(sys.argv[1]) if len(sys.argv) > 1 else PROJECT_ROOT / '.env'
+    output_path = Path(sys.argv[2]) if len(sys.argv) > 2 else PROJECT_ROOT / '_compiled_env.py'
+    if not env_path.exists():
+        print(f"未找到 .env 文件: {env_path}")
+        sys.exit(1)
+    count = compile_env(env_path, output_path)
+    print(f"已生成 {output_path}（{count} 个环境变量）")
@@ -4,13 +4,69 @@
 """
 import json
 import logging
+import os
+import tempfile
+import time
 from pathlib import Path
 from typing import Optional, Dict, Any
-from datetime import datetime, timedelta
+from datetime import datetime
+
+try:
+    import orjson  # 可选依赖，C 实现的 JSON 编解码，比标准库快数倍
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
 
+def _dump_json(data: Dict[str, Any]) -> bytes:
+    """将会话数据一次性序列化为紧凑的字节串（标准库回退时使用默认的 ASCII 转义，cookies/URL 本身即为 ASCII）"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(',', ':')).encode('ascii')
+
+
+def _load_json(raw: bytes) -> Dict[str, Any]:
+    """从字节串解析会话数据"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _atomic_write_bytes(path: Path, data: bytes):
+    """
+    原子写入文件：先写入同目录下的临时文件，再用 os.replace 替换目标文件
+
+    进程在写入中途被终止时，原文件保持完整，不会因会话文件损坏而需要重新登录
+    """
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def _get_saved_at_epoch(session_data: Dict[str, Any]) -> Optional[float]:
+    """
+    获取会话保存时间（Unix 时间戳）
+
+    优先读取 saved_at_epoch；旧版本会话文件只有 ISO 格式的 saved_at，此时再解析
+    """
+    saved_at_epoch = session_data.get('saved_at_epoch')
+    if saved_at_epoch is not None:
+        return float(saved_at_epoch)
+    saved_at_str = session_data.get('saved_at')
+    if saved_at_str:
+        return datetime.fromisoformat(saved_at_str).timestamp()
+    return None
+
+
 class SessionManager:
     """会话管理器类"""
     
@@ -23,6 +79,43 @@ class SessionManager:
         """
         self.session_path = session_path
         self.session_data: Optional[Dict[str, Any]] = None
+        # 已验证并清理过的 storage_state 缓存（_cached_at 为该会话的保存时间戳）
+        self._cached_state: Optional[Dict[str, Any]] = None
+        self._cached_at: Optional[float] = None
+    
+    @property
+    def timestamp_path(self) -> Path:
+        """会话文件由 Playwright 直接写入时，保存时间记录在同名的 .ts 文件中"""
+        return self.session_path.with_suffix('.ts')
+    
+    def mark_saved(self) -> bool:
+        """
+        记录会话保存时间（用于通过 context.storage_state(path=...) 直接写入的会话文件）
+        
+        Returns:
+            bool: 记录是否成功
+        """
+        try:
+            _atomic_write_bytes(self.timestamp_path, repr(time.time()).encode('utf-8'))
+            self.session_data = None
+            self._cached_state = None
+            logger.info(f"会话已保存到: {self.session_path}")
+            return True
+        except Exception as e:
+            logger.error(f"记录会话保存时间失败: {e}")
+            return False
+    
+    def _wrap_raw_storage_state(self, storage_state: Dict[str, Any]) -> Dict[str, Any]:
+        """将 Playwright 原生格式的 storage_state 包装为统一的会话数据格式"""
+        saved_at_epoch = None
+        if self.timestamp_path.exists():
+            saved_at_epoch = float(self.timestamp_path.read_text(encoding='utf-8'))
+        return {
+            'storage_state': storage_state,
+            'saved_at': datetime.fromtimestamp(saved_at_epoch).isoformat() if saved_at_epoch else None,
+            'saved_at_epoch': saved_at_epoch,
+            'version': '1.0'
+        }
     
     def save_session(self, storage_state: Dict[str, Any]) -> bool:
         """
@@ -35,21 +128,26 @@ class SessionManager:
             bool: 保存是否成功
         """
         try:
-            # 添加保存时间戳
+            # 添加保存时间戳（saved_at 保留 ISO 格式以兼容旧版本，有效期判断使用 saved_at_epoch）
+            saved_at_epoch = time.time()
             session_data = {
                 'storage_state': storage_state,
-                'saved_at': datetime.now().isoformat(),
+                'saved_at': datetime.fromtimestamp(saved_at_epoch).isoformat(),
+                'saved_at_epoch': saved_at_epoch,
                 'version': '1.0'
             }
             
             # 确保目录存在
             self.session_path.parent.mkdir(parents=True, exist_ok=True)
             
-            # 保存到文件
-            with open(self.session_path, 'w', encoding='utf-8') as f:
-                json.dump(session_data, f, indent=2, ensure_ascii=False)
+            # 一次性序列化后整体原子写入，避免 json.dump 的大量小块写入
+            _atomic_write_bytes(self.session_path, _dump_json(session_data))
+            # 会话文件已改为包装格式，原生格式遗留的 .ts 时间戳不再适用，删除后
+            # get_storage_state_path() 不会把包装格式的文件直接交给 Playwright
+            self.timestamp_path.unlink(missing_ok=True)
             
             self.session_data = session_data
+            self._cached_state = None
             logger.info(f"会话已保存到: {self.session_path}")
             return True
             
@@ -69,8 +167,13 @@ class SessionManager:
                 logger.warning(f"会话文件不存在: {self.session_path}")
                 return None
             
-            with open(self.session_path, 'r', encoding='utf-8') as f:
-                self.session_data = json.load(f)
+            # 一次性读取整个文件再解析，避免文本模式下分块读取和逐块解码
+            session_data = _load_json(self.session_path.read_bytes())
+            if 'storage_state' not in session_data and 'cookies' in session_data:
+                # Playwright 直接写入的原生 storage_state 文件
+                session_data = self._wrap_raw_storage_state(session_data)
+            self.session_data = session_data
+            self._cached_state = None
             
             # 提取storage_state
             storage_state = self.session_data.get('storage_state')
@@ -107,27 +210,24 @@ class SessionManager:
                 return False
             
             # 检查保存时间
-            saved_at_str = self.session_data.get('saved_at')
-            if not saved_at_str:
+            saved_at_epoch = _get_saved_at_epoch(self.session_data)
+            if saved_at_epoch is None:
                 logger.warning("会话文件中缺少保存时间戳")
                 return False
             
-            saved_at = datetime.fromisoformat(saved_at_str)
-            age = datetime.now() - saved_at
+            age = time.time() - saved_at_epoch
             
-            if age > timedelta(hours=max_age_hours):
-                logger.warning(f"会话已过期（超过{max_age_hours}小时），保存时间: {saved_at}, 已过期: {age}")
+            if age > max_age_hours * 3600:
+                logger.warning(f"会话已过期（超过{max_age_hours}小时），保存时间: {self.session_data.get('saved_at')}, 已使用: {age / 3600:.1f} 小时")
                 return False
             
             # 检查是否有cookies
             storage_state = self.session_data.get('storage_state', {})
-            cookies = storage_state.get('cookies', [])
-            
-            if not cookies:
+            if not storage_state.get('cookies'):
                 logger.warning("会话中没有cookies")
                 return False
             
-            logger.info(f"会话有效，保存时间: {saved_at}, 已使用: {age}")
+            logger.info(f"会话有效，保存时间: {self.session_data.get('saved_at')}, 已使用: {age / 3600:.1f} 小时")
             return True
             
         except Exception as e:
@@ -144,25 +244,53 @@ class SessionManager:
         Returns:
             Optional[Dict]: 清理后的storage_state数据，如果会话无效或过期返回None
         """
-        # 先检查会话是否有效（包括时间检查）
+        # 已验证过且仍在有效期内，直接返回缓存结果
+        if self._cached_state is not None and time.time() - self._cached_at < max_age_hours * 3600:
+            return self._cached_state
+        
+        # 先检查会话是否有效（包括时间检查，验证时会加载会话数据）
         if not self.is_session_valid(max_age_hours=max_age_hours):
             logger.warning(f"会话无效或已过期（超过{max_age_hours}小时），返回None")
             return None
         
-        # 如果会话有效，返回storage_state
-        if not self.session_data:
-            self.load_session()
-        
-        if not self.session_data:
-            return None
-        
         storage_state = self.session_data.get('storage_state')
         if storage_state:
             # 自动清理大型localStorage数据，避免打印到终端
             storage_state = self.clean_storage_state(storage_state)
+            self._cached_state = storage_state
+            self._cached_at = _get_saved_at_epoch(self.session_data)
         
         return storage_state
     
+    def get_storage_state_path(self, max_age_hours: int = 24) -> Optional[str]:
+        """
+        获取可直接传给 Playwright 的会话文件路径（不解析文件内容）
+        
+        仅适用于通过 context.storage_state(path=...) 写入、并由 mark_saved() 记录了保存时间的会话文件，
+        有效期只根据 .ts 文件中的时间戳判断（save_session() 写入包装格式时会删除 .ts 文件）
+        
+        Args:
+            max_age_hours: 会话最大有效期（小时），默认24小时
+            
+        Returns:
+            Optional[str]: 会话文件路径，如果不是原生格式、缺少时间戳或已过期返回None
+        """
+        try:
+            if not self.session_path.exists() or not self.timestamp_path.exists():
+                return None
+            saved_at_epoch = float(self.timestamp_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            logger.error(f"读取会话保存时间失败: {e}")
+            return None
+        
+        age = time.time() - saved_at_epoch
+        if age > max_age_hours * 3600:
+            logger.warning(f"会话已过期（超过{max_age_hours}小时），已使用: {age / 3600:.1f} 小时")
+            return None
+        
+        logger.info(f"会话有效，已使用: {age / 3600:.1f} 小时")
+        return str(self.session_path)
+    
     def clean_storage_state(self, storage_state: Dict[str, Any]) -> Dict[str, Any]:
         """
         清理 storage_state 中的大型 localStorage 数据，避免在加载时打印到终端
@@ -176,8 +304,12 @@ class SessionManager:
         if not storage_state:
             return storage_state
         
+        # 已经只包含 cookies（例如按新格式保存的会话），无需再构建新字典
+        if 'origins' not in storage_state and 'sessionStorage' not in storage_state:
+            return storage_state
+        
         # 创建 storage_state 的副本，只保留 cookies，完全移除 localStorage 和 sessionStorage
-        # 这样可以避免打印大量 JavaScript 代码到终端
+        # 这样可以避免打印大量 JavaScript 代码到终端（cookies 列表只读，直接引用不复制）
         cleaned_state = {
             'cookies': storage_state.get('cookies', [])
         }
@@ -196,6 +328,10 @@ class SessionManager:
             bool: 删除是否成功
         """
         try:
+            self.session_data = None
+            self._cached_state = None
+            if self.timestamp_path.exists():
+                self.timestamp_path.unlink()
             if self.session_path.exists():
                 self.session_path.unlink()
                 logger.info(f"会话文件已删除: {self.session_path}")
@@ -5,8 +5,9 @@
 此模块作为主入口，实际的查询功能已拆分到 utils/sms_query_tools.py
 """
 import asyncio
-from typing import Dict
-from playwright.async_api import Page
+from types import MappingProxyType
+from typing import Dict, List, Optional
+from playwright.async_api import Page, Locator
 
 # 从工具模块导入查询函数和配置
 from utils.sms_query_tools import (
@@ -22,7 +23,8 @@ __all__ = [
     'query_sms_signature',
     'query_sms_success_rate',
     'SELECTORS',
-    'SMSQueryBase'
+    'SMSQueryBase',
+    'SMSSignatureQuery'
 ]
 
 
@@ -33,6 +35,9 @@ class SMSQueryBase:
     子类可以实现不同的查询方法
     """
     
+    # 批量查询时可能创建大量实例，使用 __slots__ 省去每个实例的 __dict__
+    __slots__ = ('page', 'selectors', '_locator_cache')
+    
     def __init__(self, page: Page):
         """
         初始化查询对象
@@ -41,7 +46,25 @@ class SMSQueryBase:
             page: Playwright Page 对象
         """
         self.page = page
-        self.selectors = SELECTORS.copy()
+        # SELECTORS 为只读视图，实例在调用 update_selectors 前直接共享，无需各自复制
+        self.selectors = SELECTORS
+        # 按选择器缓存 Locator，同一页面上的多次查询复用同一对象
+        self._locator_cache: Dict[str, Locator] = {}
+    
+    def locator(self, selector: str) -> Locator:
+        """
+        获取选择器对应的 Locator（首次创建后缓存）
+        
+        Args:
+            selector: 选择器字符串
+            
+        Returns:
+            Locator: 当前页面上的 Locator 对象
+        """
+        cached = self._locator_cache.get(selector)
+        if cached is None:
+            cached = self._locator_cache[selector] = self.page.locator(selector)
+        return cached
     
     async def query(self, *args, **kwargs) -> Dict[str, any]:
         """
@@ -59,14 +82,102 @@ class SMSQueryBase:
         Args:
             **kwargs: 选择器键值对
         """
+        # 首次修改时才复制一份，之后在副本上更新（写时复制）
+        if isinstance(self.selectors, MappingProxyType):
+            self.selectors = dict(self.selectors)
         self.selectors.update(kwargs)
 
 
+class SMSSignatureQuery(SMSQueryBase):
+    """
+    短信签名查询（复用 SMSQueryBase 缓存的 Locator，适合同一页面上多次查询）
+    """
+    
+    __slots__ = ()
+    
+    async def query(
+        self,
+        pid: Optional[str] = None,
+        sign_name: Optional[str] = None,
+        timeout: int = 30000
+    ) -> Dict[str, any]:
+        """
+        查询短信签名并获取工单号，参数与返回值同 query_sms_signature
+        
+        Args:
+            pid: 客户PID（如果不提供，则从环境变量 SMS_PID 读取）
+            sign_name: 签名名称（如果不提供，则从环境变量 SMS_SIGN_NAME 读取）
+            timeout: 操作超时时间（毫秒），默认30秒
+            
+        Returns:
+            Dict: 查询结果
+        """
+        return await query_sms_signature(
+            self.page, pid, sign_name, timeout=timeout, locator=self.locator
+        )
+
+
+# 成功率表格行格式（签名、成功率、短信类型、提交量）及分隔线、表头
+_ROW_FMT = "{:<20} {:<15} {:<15} {:<15}".format
+_DASH60 = "-" * 60
+_EQ60 = "=" * 60
+_HEADER = _ROW_FMT('签名', '成功率', '短信类型', '提交量')
+
+
+def _format_row(row: Dict[str, any]) -> str:
+    """
+    将成功率数据行格式化为表格中的一行
+    
+    Args:
+        row: 成功率查询返回的数据行
+        
+    Returns:
+        str: 格式化后的文本行
+    """
+    sign_name = row.get('signname') or row.get('sign_name', 'N/A')
+    success_rate = row.get('receipt_success_rate') or row.get('success_rate', 'N/A')
+    sms_type = row.get('sms_type') or row.get('template_type', 'N/A')
+    submit_count = row.get('submit_count') or row.get('total_sent', 'N/A')
+    
+    # 格式化成功率显示（移除%符号，只保留数字）
+    if isinstance(success_rate, (int, float)):
+        success_rate_str = str(success_rate)
+    else:
+        success_rate_str = str(success_rate).replace('%', '').strip()
+    
+    # 格式化提交量（保持原始格式，不添加千位分隔符）
+    if isinstance(submit_count, (int, float)):
+        submit_count_str = str(int(submit_count))
+    else:
+        submit_count_str = str(submit_count)
+    
+    return _ROW_FMT(sign_name, success_rate_str, sms_type, submit_count_str)
+
+
+def _format_table(time_range: str, rows: List[Dict[str, any]]) -> str:
+    """
+    将某个时间范围的成功率数据格式化为完整的表格文本（标题、表头和所有数据行）
+    
+    整张表拼接为一个字符串后一次输出，避免逐行 print
+    
+    Args:
+        time_range: 时间范围
+        rows: 成功率查询返回的数据行列表
+        
+    Returns:
+        str: 表格文本
+    """
+    lines = [f"\n{time_range}成功率", _DASH60, _HEADER, _DASH60]
+    lines.extend(map(_format_row, rows))
+    return '\n'.join(lines)
+
+
 if __name__ == '__main__':
     """
     示例：使用短信签名查询功能
     """
     import asyncio
+    from config import BROWSER_PERSISTENT, SMS_PID
     from login_module import create_playwright_session
     
     async def main():
@@ -74,7 +185,8 @@ if __name__ == '__main__':
         print("正在创建浏览器会话...")
         playwright, browser, context, page = await create_playwright_session(
             headless=False,
-            viewport={'width': 1280, 'height': 1100}  # 设置浏览器窗口尺寸为 1280×1100
+            viewport={'width': 1280, 'height': 1100},  # 设置浏览器窗口尺寸为 1280×1100
+            persistent=BROWSER_PERSISTENT  # 持久化配置目录可跨运行复用 cookies 和 HTTP 缓存
         )
         print("浏览器会话已创建")
         
@@ -96,29 +208,26 @@ if __name__ == '__main__':
                 print(f"\n[FAIL] 查询失败: {signature_result['error']}")
             
             # 查询短信签名成功率（多时间范围）
-            print("\n" + "="*60)
+            print("\n" + _EQ60)
             print("开始查询短信签名成功率（多时间范围）...")
-            print("="*60)
+            print(_EQ60)
             
-            # 查询多个时间范围的成功率
+            # 查询多个时间范围的成功率（每个时间范围使用独立页面并发查询）
             multi_result = await query_sms_success_rate_multi(
                 page=page,
-                time_ranges=['当天', '一周', '本周', '30天']
+                time_ranges=['当天', '一周', '本周', '30天'],
+                parallel=True
             )
             
             # 查询资质工单（如果工单号查询成功）
             qualification_result = None
             if signature_result.get('success') and signature_result.get('work_order_id'):
-                print("\n" + "="*60)
+                print("\n" + _EQ60)
                 print("开始查询资质工单...")
-                print("="*60)
+                print(_EQ60)
                 
                 # 从环境变量或配置中获取PID
-                try:
-                    from config import SMS_PID
-                    pid = SMS_PID
-                except ImportError:
-                    pid = None
+                pid = SMS_PID
                 
                 if pid:
                     qualification_result = await query_qualification_work_order(
@@ -150,41 +259,17 @@ if __name__ == '__main__':
                     # 检查该时间范围的结果是否存在
                     if time_range not in multi_result['results']:
                         print(f"\n{time_range}成功率")
-                        print("-" * 60)
+                        print(_DASH60)
                         print(f"查询失败: 该时间范围的查询结果不存在")
                         continue
                     
                     result = multi_result['results'][time_range]
                     
                     if result['success'] and result.get('data'):
-                        print(f"\n{time_range}成功率")
-                        print("-" * 60)
-                        print(f"{'签名':<20} {'成功率':<15} {'短信类型':<15} {'提交量':<15}")
-                        print("-" * 60)
-                        
-                        for row in result['data']:
-                            sign_name = row.get('signname') or row.get('sign_name', 'N/A')
-                            success_rate = row.get('receipt_success_rate') or row.get('success_rate', 'N/A')
-                            sms_type = row.get('sms_type') or row.get('template_type', 'N/A')
-                            submit_count = row.get('submit_count') or row.get('total_sent', 'N/A')
-                            
-                            # 格式化成功率显示（移除%符号，只保留数字）
-                            if isinstance(success_rate, (int, float)):
-                                success_rate_str = f"{success_rate}"
-                            else:
-                                # 移除%符号，只保留数字
-                                success_rate_str = str(success_rate).replace('%', '').strip()
-                            
-                            # 格式化提交量（保持原始格式，不添加千位分隔符）
-                            if isinstance(submit_count, (int, float)):
-                                submit_count_str = f"{int(submit_count)}"
-                            else:
-                                submit_count_str = str(submit_count)
-                            
-                            print(f"{sign_name:<20} {success_rate_str:<15} {sms_type:<15} {submit_count_str:<15}")
+                        print(_format_table(time_range, result['data']))
                     else:
                         print(f"\n{time_range}成功率")
-                        print("-" * 60)
+                        print(_DASH60)
                         if not result.get('success', False):
                             print(f"查询失败: {result.get('error', '未知错误')}")
                         else:
@@ -198,7 +283,7 @@ if __name__ == '__main__':
                     # 检查该时间范围的结果是否存在
                     if time_range not in multi_result['results']:
                         print(f"\n{time_range}成功率")
-                        print("-" * 60)
+                        print(_DASH60)
                         print(f"查询失败: 该时间范围的查询结果不存在（可能因为首次查询失败导致后续查询未执行）")
                         continue
                     
@@ -208,36 +293,12 @@ if __name__ == '__main__':
                             print(f"\n部分查询成功，显示成功的结果：")
                             has_success = True
                         
-                        print(f"\n{time_range}成功率")
-                        print("-" * 60)
-                        print(f"{'签名':<20} {'成功率':<15} {'短信类型':<15} {'提交量':<15}")
-                        print("-" * 60)
-                        
-                        for row in result['data']:
-                            sign_name = row.get('signname') or row.get('sign_name', 'N/A')
-                            success_rate = row.get('receipt_success_rate') or row.get('success_rate', 'N/A')
-                            sms_type = row.get('sms_type') or row.get('template_type', 'N/A')
-                            submit_count = row.get('submit_count') or row.get('total_sent', 'N/A')
-                            
-                            # 格式化成功率显示（移除%符号，只保留数字）
-                            if isinstance(success_rate, (int, float)):
-                                success_rate_str = f"{success_rate}"
-                            else:
-                                # 移除%符号，只保留数字
-                                success_rate_str = str(success_rate).replace('%', '').strip()
-                            
-                            # 格式化提交量（保持原始格式，不添加千位分隔符）
-                            if isinstance(submit_count, (int, float)):
-                                submit_count_str = f"{int(submit_count)}"
-                            else:
-                                submit_count_str = str(submit_count)
-                            
-                            print(f"{sign_name:<20} {success_rate_str:<15} {sms_type:<15} {submit_count_str:<15}")
+                        print(_format_table(time_range, result['data']))
 
             # 最后汇总输出：工单号、资质工单号和成功率数据
-            print("\n" + "="*60)
+            print("\n" + _EQ60)
             print("查询结果汇总")
-            print("="*60)
+            print(_EQ60)
             
             # 输出工单号信息
             if signature_result.get('success'):
@@ -271,38 +332,14 @@ if __name__ == '__main__':
                     if result.get('success') and result.get('data'):
                         has_success_data = True
                         # 输出完整表格格式（美化）
-                        print(f"\n{time_range}成功率")
-                        print("-" * 60)
-                        print(f"{'签名':<20} {'成功率':<15} {'短信类型':<15} {'提交量':<15}")
-                        print("-" * 60)
-                        
-                        for row in result['data']:
-                            sign_name = row.get('signname') or row.get('sign_name', 'N/A')
-                            success_rate = row.get('receipt_success_rate') or row.get('success_rate', 'N/A')
-                            sms_type = row.get('sms_type') or row.get('template_type', 'N/A')
-                            submit_count = row.get('submit_count') or row.get('total_sent', 'N/A')
-                            
-                            # 格式化成功率显示（移除%符号，只保留数字）
-                            if isinstance(success_rate, (int, float)):
-                                success_rate_str = f"{success_rate}"
-                            else:
-                                # 移除%符号，只保留数字
-                                success_rate_str = str(success_rate).replace('%', '').strip()
-                            
-                            # 格式化提交量（保持原始格式，不添加千位分隔符）
-                            if isinstance(submit_count, (int, float)):
-                                submit_count_str = f"{int(submit_count)}"
-                            else:
-                                submit_count_str = str(submit_count)
-                            
-                            print(f"{sign_name:<20} {success_rate_str:<15} {sms_type:<15} {submit_count_str:<15}")
+                        print(_format_table(time_range, result['data']))
                     elif not result.get('success'):
                         print(f"\n{time_range}成功率")
-                        print("-" * 60)
+                        print(_DASH60)
                         print(f"查询失败: {result.get('error', '未知错误')}")
                 else:
                     print(f"\n{time_range}成功率")
-                    print("-" * 60)
+                    print(_DASH60)
                     print(f"查询结果不存在")
             
             if not has_success_data:
@@ -5,10 +5,10 @@
 
 # 从子模块导入所有公共接口，便于外部使用
 from .constants import SELECTORS, SIGN_QUERY_URL, SUCCESS_RATE_QUERY_URL, QUALIFICATION_ORDER_QUERY_URL
-from .helpers import extract_work_order_id, parse_datetime, extract_cell_text
+from .helpers import extract_work_order_id, parse_datetime, extract_cell_text, install_xhr_tracker, wait_for_xhr_idle
 from .logger import Logger, get_logger, default_logger
-from .sms_signature_query import query_sms_signature
-from .sms_success_rate_query import query_sms_success_rate, query_sms_success_rate_multi
+from .sms_signature_query import query_sms_signature, query_sms_signature_multi
+from .sms_success_rate_query import query_sms_success_rate, query_sms_success_rate_multi, query_sms_signature_and_success_rate
 from .qualification_query import query_qualification_work_order
 
 __all__ = [
@@ -19,11 +19,15 @@ __all__ = [
     'extract_work_order_id',
     'parse_datetime',
     'extract_cell_text',
+    'install_xhr_tracker',
+    'wait_for_xhr_idle',
     'Logger',
     'get_logger',
     'default_logger',
     'query_sms_signature',
+    'query_sms_signature_multi',
     'query_sms_success_rate',
     'query_sms_success_rate_multi',
+    'query_sms_signature_and_success_rate',
     'query_qualification_work_order',
 ]
@@ -2,14 +2,16 @@
 常量配置模块
 包含页面URL和元素选择器配置
 """
+from types import MappingProxyType
 
 # 页面配置
 SIGN_QUERY_URL = "https://alicom-ops.alibaba-inc.com/dysms/dysms_sa/analyze_search/sign"
 SUCCESS_RATE_QUERY_URL = "https://alicom-ops.alibaba-inc.com/dysms/dysms_schedule_data_center/dysms_datacenter_recommend_failure"
 QUALIFICATION_ORDER_QUERY_URL = "https://alicom-ops.alibaba-inc.com/dyorder/dyorder_new/dyorder_search"
 
-# 页面元素选择器配置（便于后期调整）
-SELECTORS = {
+# 页面元素选择器配置（便于后期调整，直接修改下方字典；运行时为只读，
+# 如需按实例调整请使用 SMSQueryBase.update_selectors）
+SELECTORS = MappingProxyType({
     'partner_id': '#PartnerId',  # 客户PID输入框（签名查询页面）
     'sign_name': '#SignName',    # 签名名称输入框
     'table_row': 'tr.dumbo-antd-0-1-18-table-row',  # 表格行
@@ -33,4 +35,4 @@ SELECTORS = {
     'qualification_id_value': 'pre',  # 资质ID值（pre标签，不依赖可变属性）
     'qualification_pid_input': 'input#PartnerId, input[placeholder*="PID"], input[placeholder*="pid"]',  # PID输入框
     'qualification_sms_row': 'tr.ant-table-row:has-text("短信资质(智能)")',  # 包含"短信资质(智能)"的行
-}
+})
@@ -2,9 +2,63 @@
 辅助函数模块
 包含通用的工具函数
 """
+import asyncio
 import re
 from datetime import datetime
 from typing import Optional
+from playwright.async_api import BrowserContext, TimeoutError as PlaywrightTimeoutError
+
+# 工单号匹配（连续的数字），模块加载时预编译
+_WORK_ORDER_RE = re.compile(r'\d+')
+
+# 日期时间解析失败时返回的最小值（用于排序）
+_DT_MIN = datetime.min
+
+# 在每个页面和 iframe 中统计未完成的 XHR/fetch 请求数，并记录最近一次请求开始或结束的时间
+_XHR_TRACKER_JS = '''(() => {
+    if (window.__smsPendingRequests !== undefined) return;
+    window.__smsPendingRequests = 0;
+    window.__smsLastNetworkActivity = performance.now();
+    const begin = () => {
+        window.__smsPendingRequests++;
+        window.__smsLastNetworkActivity = performance.now();
+    };
+    const end = () => {
+        window.__smsPendingRequests--;
+        window.__smsLastNetworkActivity = performance.now();
+    };
+    const send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function (...args) {
+        begin();
+        this.addEventListener("loadend", end, { once: true });
+        try {
+            return send.apply(this, args);
+        } catch (e) {
+            end();
+            throw e;
+        }
+    };
+    const fetch = window.fetch;
+    if (fetch) {
+        window.fetch = function (...args) {
+            begin();
+            return fetch.apply(this, args).finally(end);
+        };
+    }
+})()'''
+
+# 记录开始等待的时刻（页面内 performance.now()），作为 _XHR_IDLE_JS 的 mark 参数
+_NOW_JS = '() => performance.now()'
+
+# 判断请求是否已空闲（配合 Frame.wait_for_function 使用，参数为 {idleMs, mark}）：
+# 开始等待后有过请求活动（请求开始或结束时间晚于 mark）、当前没有未完成的请求，且距最近一次请求活动已超过 idleMs 毫秒。
+# 开始等待前就已空闲的页面不算空闲，避免在点击触发的请求发出之前就返回；未安装计数脚本时返回 "untracked"
+_XHR_IDLE_JS = '''({idleMs, mark}) => {
+    if (window.__smsPendingRequests === undefined) return "untracked";
+    if (window.__smsPendingRequests > 0) return false;
+    const last = window.__smsLastNetworkActivity;
+    return last > mark && performance.now() - last >= idleMs;
+}'''
 
 
 def extract_work_order_id(text: str) -> Optional[str]:
@@ -20,19 +74,18 @@ def extract_work_order_id(text: str) -> Optional[str]:
     Returns:
         Optional[str]: 提取出的工单号，如果未找到则返回 None
     """
+    # 空文本（包括 None）直接返回，不进入正则匹配
     if not text:
         return None
     
-    # 去除空白字符
-    text = text.strip()
-    
-    # 尝试提取纯数字（工单号通常是纯数字）
-    # 匹配连续的数字
-    match = re.search(r'\d+', text)
-    if match:
-        return match.group(0)
+    # 文本本身就是纯数字时直接返回（isdecimal 与正则 \d 的字符范围一致）
+    if text.isdecimal():
+        return text
     
-    return None
+    # 尝试提取纯数字（工单号通常是纯数字），匹配连续的数字
+    # 首尾空白不影响数字匹配，无需先 strip 生成新字符串
+    match = _WORK_ORDER_RE.search(text)
+    return match.group(0) if match else None
 
 
 def parse_datetime(date_str: str) -> datetime:
@@ -46,11 +99,11 @@ def parse_datetime(date_str: str) -> datetime:
         datetime: 解析后的datetime对象，如果解析失败返回最小datetime
     """
     try:
-        # 尝试解析格式: "YYYY-MM-DD HH:MM:SS"
-        return datetime.strptime(date_str.strip(), "%Y-%m-%d %H:%M:%S")
+        # 格式 "YYYY-MM-DD HH:MM:SS" 属于 ISO 8601，fromisoformat 由 C 实现，比 strptime 快得多
+        return datetime.fromisoformat(date_str.strip())
     except (ValueError, AttributeError, TypeError):
         # 如果解析失败，返回最小datetime（用于排序）
-        return datetime.min
+        return _DT_MIN
 
 
 async def extract_cell_text(cell) -> str:
@@ -75,3 +128,55 @@ async def extract_cell_text(cell) -> str:
             return await cell.inner_text()
         except Exception:
             return ''
+
+
+async def install_xhr_tracker(context: BrowserContext):
+    """
+    在浏览器上下文中安装 XHR/fetch 请求计数脚本（对之后加载的所有页面和 iframe 生效），
+    供 wait_for_xhr_idle 判断请求是否已完成
+    
+    Args:
+        context: Playwright BrowserContext 对象
+    """
+    await context.add_init_script(_XHR_TRACKER_JS)
+
+
+async def wait_for_xhr_idle(
+    target,
+    idle_ms: int = 300,
+    timeout: int = 10000,
+    fallback_delay: float = 0
+) -> bool:
+    """
+    等待页面或 iframe 内的 XHR/fetch 请求全部完成并保持空闲 idle_ms 毫秒（在页面内轮询，空闲即返回）
+    
+    只有调用本函数之后发生过请求活动才算空闲：点击等操作触发的请求尚未发出时不会提前返回
+    
+    Args:
+        target: Playwright Page 或 Frame 对象
+        idle_ms: 判定为空闲所需的无请求时长（毫秒）
+        timeout: 最长等待时间（毫秒），超时后直接返回
+        fallback_delay: 无法判断空闲时的固定等待秒数：未通过 install_xhr_tracker 安装计数脚本时固定等待该时长；
+                        超时（期间没有请求活动或请求未完成）时，总等待时间不少于该时长
+        
+    Returns:
+        bool: 是否在超时前达到空闲（超时或未安装计数脚本时返回 False）
+    """
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    try:
+        mark = await target.evaluate(_NOW_JS)
+        handle = await target.wait_for_function(
+            _XHR_IDLE_JS, arg={'idleMs': idle_ms, 'mark': mark}, polling=100, timeout=timeout
+        )
+    except PlaywrightTimeoutError:
+        # 超时：补足旧的固定等待时长
+        remaining = fallback_delay - (loop.time() - started)
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+        return False
+    if await handle.json_value() == 'untracked':
+        if fallback_delay:
+            await asyncio.sleep(fallback_delay)
+        return False
+    return True
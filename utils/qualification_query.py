@@ -7,6 +7,40 @@ from typing import Dict, Optional
 from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
 
 from .constants import QUALIFICATION_ORDER_QUERY_URL, SELECTORS
+from .helpers import wait_for_xhr_idle
+from .logger import get_logger
+
+try:
+    # 只导入模块本身，环境变量在首次访问配置项时才解析
+    import config as _config
+except ImportError:
+    _config = None
+
+# 控制台只输出 INFO 及以上级别，逐行的明细使用 DEBUG 级别，仅写入日志文件
+logger = get_logger('qualification')
+
+# 一次性取出一行中所有单元格的文本（配合 ElementHandle.eval_on_selector_all 使用）
+_CELL_TEXTS_JS = 'cells => cells.map(cell => cell.innerText.trim())'
+
+# 在页面内一次性筛选包含"短信资质"的表格行并取出工单号链接文本（配合 Locator.evaluate_all 使用，参数为行元素数组）：
+# 返回 {row_count: 行数, order_ids: 各匹配行的工单号，没有链接时为空字符串}
+_SMS_QUALIFICATION_ORDER_IDS_JS = '''rows => ({
+    row_count: rows.length,
+    order_ids: rows
+        .filter(row => row.innerText.includes("短信资质"))
+        .map(row => {
+            const link = row.querySelector("td.ant-table-cell a");
+            return link ? link.innerText.trim() : "";
+        }),
+})'''
+
+# 判断分页器中是否存在未禁用的下一页按钮（aria-disabled 不为 true 且没有 ant-pagination-disabled 类，配合 Page.evaluate 使用）
+_HAS_NEXT_PAGE_JS = '''() => {
+    const button = document.querySelector("li.ant-pagination-next");
+    return Boolean(button)
+        && button.getAttribute("aria-disabled") !== "true"
+        && !button.classList.contains("ant-pagination-disabled");
+}'''
 
 
 async def click_query_button_with_retry(
@@ -26,9 +60,9 @@ async def click_query_button_with_retry(
         selector: 查询按钮选择器（如果不提供，使用默认选择器）
         max_retries: 最大重试次数，默认3次
         delay_before: 点击前的延迟（秒）
-        delay_after: 点击后的延迟（秒）
+        delay_after: 点击后等待查询请求完成的最长时间（秒），请求空闲即提前返回
         retry_delay: 重试前的延迟（秒）
-        print_message: 是否打印消息
+        print_message: 是否输出日志消息
         
     Returns:
         bool: 是否成功点击
@@ -40,9 +74,9 @@ async def click_query_button_with_retry(
         try:
             if print_message:
                 if attempt > 1:
-                    print(f"正在点击查询按钮（第 {attempt} 次尝试）...")
+                    logger.info(f"正在点击查询按钮（第 {attempt} 次尝试）...")
                 else:
-                    print("正在点击查询按钮...")
+                    logger.info("正在点击查询按钮...")
             
             query_button = await page.wait_for_selector(
                 selector,
@@ -54,22 +88,22 @@ async def click_query_button_with_retry(
             await asyncio.sleep(delay_before)
             await query_button.click()
             
-            # 增加等待时间，确保查询完成且避免频繁请求
-            await asyncio.sleep(delay_after)
+            # 等待查询请求完成（空闲即继续，最长 delay_after 秒；未安装请求计数脚本时固定等待 delay_after 秒）
+            await wait_for_xhr_idle(page, timeout=int(delay_after * 1000), fallback_delay=delay_after)
             
             if print_message:
-                print("  ✓ 查询按钮已点击")
+                logger.info("  ✓ 查询按钮已点击")
             return True
             
         except Exception as e:
             if attempt < max_retries:
                 if print_message:
-                    print(f"  ⚠ 点击查询按钮失败（第 {attempt} 次尝试）: {e}")
-                    print(f"  ⚠ {retry_delay} 秒后重试...")
+                    logger.warning(f"  ⚠ 点击查询按钮失败（第 {attempt} 次尝试）: {e}")
+                    logger.warning(f"  ⚠ {retry_delay} 秒后重试...")
                 await asyncio.sleep(retry_delay)
             else:
                 if print_message:
-                    print(f"  ✗ 点击查询按钮失败（已重试 {max_retries} 次）: {e}")
+                    logger.warning(f"  ✗ 点击查询按钮失败（已重试 {max_retries} 次）: {e}")
                 return False
     
     return False
@@ -116,19 +150,7 @@ async def query_qualification_work_order(
     """
     # 如果未提供pid，从环境变量读取
     if not pid:
-        try:
-            from config import SMS_PID
-            pid = SMS_PID
-            
-            if not pid:
-                return {
-                    'success': False,
-                    'work_order_id': None,
-                    'qualification_id': None,
-                    'qualification_group_id': None,
-                    'error': '客户PID未提供，请在函数参数中传入或在环境变量中配置 SMS_PID'
-                }
-        except ImportError:
+        if _config is None:
             return {
                 'success': False,
                 'work_order_id': None,
@@ -136,22 +158,27 @@ async def query_qualification_work_order(
                 'qualification_group_id': None,
                 'error': '客户PID未提供，且无法从环境变量读取'
             }
+        
+        pid = _config.SMS_PID
+        
+        if not pid:
+            return {
+                'success': False,
+                'work_order_id': None,
+                'qualification_id': None,
+                'qualification_group_id': None,
+                'error': '客户PID未提供，请在函数参数中传入或在环境变量中配置 SMS_PID'
+            }
     
     try:
         # 步骤1: 进入工单查询页面
-        print(f"正在访问工单查询页面: {QUALIFICATION_ORDER_QUERY_URL}")
+        logger.info(f"正在访问工单查询页面: {QUALIFICATION_ORDER_QUERY_URL}")
         await page.goto(QUALIFICATION_ORDER_QUERY_URL, timeout=timeout, wait_until='domcontentloaded')
-        await asyncio.sleep(1)
         
         # 步骤2: 输入工单号
-        print(f"正在输入工单号: {work_order_id}")
-        order_id_input = await page.wait_for_selector(
-            SELECTORS['qualification_order_id_input'],
-            timeout=timeout,
-            state='visible'
-        )
-        await order_id_input.fill(work_order_id)
-        await asyncio.sleep(0.5)
+        logger.info(f"正在输入工单号: {work_order_id}")
+        # Locator.fill 自动等待输入框可见且可操作，无需先 wait_for_selector，也无需填写后固定等待
+        await page.locator(SELECTORS['qualification_order_id_input']).fill(work_order_id, timeout=timeout)
         
         # 步骤3: 点击查询按钮（带重试逻辑）
         success = await click_query_button_with_retry(
@@ -171,46 +198,44 @@ async def query_qualification_work_order(
             }
         
         # 步骤4: 点击工单号链接，进入详情页面
-        print("正在点击工单号链接，进入详情页面...")
+        logger.info("正在点击工单号链接，进入详情页面...")
         order_link = await page.wait_for_selector(
             f'a:has-text("{work_order_id}")',
             timeout=10000,
             state='visible'
         )
         await order_link.click()
-        await asyncio.sleep(2)  # 等待详情页面加载
         
         # 步骤5: 获取关联资质ID
-        print("正在获取关联资质ID...")
+        logger.info("正在获取关联资质ID...")
         qualification_id = None
         try:
-            # 查找包含"关联资质ID"的行
+            # 查找包含"关联资质ID"的行（详情页面加载完成以该行出现为准，不再点击后固定等待2秒，超时相应延长）
             qualification_id_row = await page.wait_for_selector(
                 'tr.ant-table-row:has-text("关联资质ID")',
-                timeout=5000,
+                timeout=7000,
                 state='visible'
             )
             # 在同一行中查找pre标签（不依赖可变属性，直接查找pre标签）
             qualification_id_pre = await qualification_id_row.query_selector('pre')
             if qualification_id_pre:
                 qualification_id = (await qualification_id_pre.inner_text()).strip()
-                print(f"  ✓ 获取到关联资质ID: {qualification_id}")
+                logger.info(f"  ✓ 获取到关联资质ID: {qualification_id}")
             else:
                 # 如果pre标签不存在，尝试查找其他可能包含ID的元素（如td中的文本）
-                print("  ⚠ 未找到pre标签，尝试其他方式...")
+                logger.warning("  ⚠ 未找到pre标签，尝试其他方式...")
                 # 尝试查找行中的所有td，找到包含数字的单元格
-                tds = await qualification_id_row.query_selector_all('td')
-                for td in tds:
-                    td_text = (await td.inner_text()).strip()
+                td_texts = await qualification_id_row.eval_on_selector_all('td', _CELL_TEXTS_JS)
+                for td_text in td_texts:
                     # 如果单元格包含数字（可能是ID），使用它
                     if td_text and td_text.isdigit():
                         qualification_id = td_text
-                        print(f"  ✓ 从td中获取到关联资质ID: {qualification_id}")
+                        logger.info(f"  ✓ 从td中获取到关联资质ID: {qualification_id}")
                         break
                 if not qualification_id:
-                    print("  ⚠ 未找到关联资质ID")
+                    logger.warning("  ⚠ 未找到关联资质ID")
         except Exception as e:
-            print(f"  ✗ 获取关联资质ID失败: {e}")
+            logger.warning(f"  ✗ 获取关联资质ID失败: {e}")
         
         if not qualification_id:
             return {
@@ -222,29 +247,29 @@ async def query_qualification_work_order(
             }
         
         # 步骤6: 返回工单查询页面
-        print("正在返回工单查询页面...")
+        logger.info("正在返回工单查询页面...")
         await page.goto(QUALIFICATION_ORDER_QUERY_URL, timeout=timeout, wait_until='domcontentloaded')
-        await asyncio.sleep(1)
         
         # 步骤7: 输入PID并查询
-        print(f"正在输入PID: {pid}")
-        # 尝试多种PID输入框选择器（按优先级排序）
+        logger.info(f"正在输入PID: {pid}")
+        # 尝试多种PID输入框选择器（按优先级排序；ID 唯一，input#UserId 与 #UserId 匹配同一元素，不再重复检查）
+        # 每项为 (选择器, 等待可见的超时毫秒数)：必须先等待 #UserId，页面上其他"请输入"输入框（如工单号输入框）
+        # 可能先于它出现，不能与通用选择器一起等待；#UserId 不存在时通用选择器只短暂等待
         pid_input = None
         pid_selector = [
-            '#UserId',
-            'input#UserId', 
-            'input[placeholder="请输入"]'
-          ]
-        for selector in pid_selector:
+            ('#UserId', 5000),
+            ('input[placeholder="请输入"]', 2000)
+        ]
+        for selector, selector_timeout in pid_selector:
+            candidate = page.locator(selector).first
             try:
-                #wait for selector
-                pid_input = await page.wait_for_selector(selector, timeout=5000, state='visible')
+                await candidate.wait_for(timeout=selector_timeout, state='visible')
+                pid_input = candidate
                 break
-            except Exception as e:  
-                print(f"  - 查找 {selector} 失败: {e}")
-                continue
+            except PlaywrightTimeoutError:
+                logger.warning(f"  - 未找到PID输入框: {selector}")
         if not pid_input:
-            print("  ✗ 未找到PID输入框")
+            logger.error("  ✗ 未找到PID输入框")
             return {
                 'success': False,
                 'work_order_id': None,
@@ -253,22 +278,19 @@ async def query_qualification_work_order(
                 'error': '未找到PID输入框'
             }
             
-        # 清空输入框并填写PID
+        # 填写PID（fill 会先清空输入框再填写，完成时 input 事件已派发，无需单独清空和固定等待）
         await pid_input.click()  # 先点击获取焦点
-        await pid_input.fill('')  # 清空现有内容
-        await asyncio.sleep(0.2)
-        await pid_input.fill(pid)  # 填写新的PID
-        await asyncio.sleep(0.3)
+        await pid_input.fill(pid)
         
         # 验证输入是否成功
         input_value = await pid_input.input_value()
         if input_value == pid:
-            print(f"  ✓ PID填写成功: {input_value}")
+            logger.info(f"  ✓ PID填写成功: {input_value}")
         else:
-            print(f"  ⚠ PID填写后验证不一致: 期望={pid}, 实际={input_value}")
+            logger.warning(f"  ⚠ PID填写后验证不一致: 期望={pid}, 实际={input_value}")
         
         # 步骤7.1: 选择审核状态为"审核通过"
-        print("正在选择审核状态为'审核通过'...")
+        logger.info("正在选择审核状态为'审核通过'...")
         try:
             # 查找审核状态下拉列表（通过input的ID定位，然后找到父级select容器）
             audit_status_input = await page.query_selector('#AuditStatus')
@@ -290,14 +312,9 @@ async def query_qualification_work_order(
                 except Exception:
                     pass
             
-            # 如果前两种方法都失败，查找所有ant-select，检查哪个包含#AuditStatus
+            # 如果前两种方法都失败，查找第一个包含#AuditStatus的ant-select（由选择器引擎一次筛选，不再逐个检查）
             if not audit_status_select:
-                all_selects = await page.query_selector_all('div.ant-select')
-                for select in all_selects:
-                    has_audit_input = await select.query_selector('#AuditStatus')
-                    if has_audit_input:
-                        audit_status_select = select
-                        break
+                audit_status_select = await page.query_selector('div.ant-select:has(#AuditStatus)')
             
             if audit_status_select:
                 # 检查当前是否已选择"审核通过"
@@ -305,7 +322,7 @@ async def query_qualification_work_order(
                 if current_selection:
                     current_text = await current_selection.inner_text()
                     if current_text.strip() == '审核通过':
-                        print("  ✓ 审核状态已为'审核通过'，无需修改")
+                        logger.info("  ✓ 审核状态已为'审核通过'，无需修改")
                     else:
                         # 点击下拉列表打开选项
                         await audit_status_select.click()
@@ -320,9 +337,9 @@ async def query_qualification_work_order(
                         if option_approved:
                             await option_approved.click()
                             await asyncio.sleep(0.5)  # 等待选择生效
-                            print("  ✓ 已选择审核状态为'审核通过'")
+                            logger.info("  ✓ 已选择审核状态为'审核通过'")
                         else:
-                            print("  ⚠ 未找到'审核通过'选项，继续使用当前设置")
+                            logger.warning("  ⚠ 未找到'审核通过'选项，继续使用当前设置")
                 else:
                     # 如果没有当前选择，直接选择"审核通过"
                     await audit_status_select.click()
@@ -336,13 +353,13 @@ async def query_qualification_work_order(
                     if option_approved:
                         await option_approved.click()
                         await asyncio.sleep(0.5)  # 等待选择生效
-                        print("  ✓ 已选择审核状态为'审核通过'")
+                        logger.info("  ✓ 已选择审核状态为'审核通过'")
                     else:
-                        print("  ⚠ 未找到'审核通过'选项，继续使用当前设置")
+                        logger.warning("  ⚠ 未找到'审核通过'选项，继续使用当前设置")
             else:
-                print("  ⚠ 未找到审核状态下拉列表，继续使用默认设置")
+                logger.warning("  ⚠ 未找到审核状态下拉列表，继续使用默认设置")
         except Exception as e:
-            print(f"  ⚠ 选择审核状态失败: {e}，继续使用默认设置")
+            logger.warning(f"  ⚠ 选择审核状态失败: {e}，继续使用默认设置")
         
         # 点击查询按钮（带重试逻辑）
         success = await click_query_button_with_retry(
@@ -362,7 +379,7 @@ async def query_qualification_work_order(
             }
         
         # 步骤7.5: 设置每页显示100条（在查询结果加载后设置，减少分页次数，提高效率）
-        print("正在设置每页显示100条...")
+        logger.info("正在设置每页显示100条...")
         try:
             # 查找分页器中的下拉框（ant-select）
             page_size_select = await page.query_selector('li.ant-pagination-options .ant-select')
@@ -380,65 +397,51 @@ async def query_qualification_work_order(
                 if option_100:
                     await option_100.click()
                     await asyncio.sleep(0.5)  # 等待选择生效
-                    print("  ✓ 已设置每页显示100条")
+                    logger.info("  ✓ 已设置每页显示100条")
                 else:
-                    print("  ⚠ 未找到'100 条/页'选项，使用默认设置")
+                    logger.warning("  ⚠ 未找到'100 条/页'选项，使用默认设置")
             else:
-                print("  ⚠ 未找到分页器下拉框，使用默认设置")
+                logger.warning("  ⚠ 未找到分页器下拉框，使用默认设置")
         except Exception as e:
-            print(f"  ⚠ 设置每页显示条数失败: {e}，继续使用默认设置")
+            logger.warning(f"  ⚠ 设置每页显示条数失败: {e}，继续使用默认设置")
         
         # 步骤8: 查找所有包含"短信资质"的行，提取工单号列表（支持分页）
-        print("正在查找所有包含'短信资质'的行...")
+        logger.info("正在查找所有包含'短信资质'的行...")
         work_order_ids = []  # 存储工单号列表，而不是元素引用
         page_num = 1
         
         while True:
-            print(f"\n--- 处理第 {page_num} 页 ---")
+            logger.info(f"\n--- 处理第 {page_num} 页 ---")
             
             # 等待当前页的表格加载
             await asyncio.sleep(1)
             
-            # 查找当前页所有表格行
-            sms_rows = await page.query_selector_all('tr.ant-table-row')
-            print(f"  第 {page_num} 页找到 {len(sms_rows)} 行数据")
+            # 查找当前页所有表格行，在页面内一次筛选包含'短信资质'的行并提取工单号（不再逐行读取文本）
+            rows_info = await page.locator('tr.ant-table-row').evaluate_all(_SMS_QUALIFICATION_ORDER_IDS_JS)
+            logger.debug(f"  第 {page_num} 页找到 {rows_info['row_count']} 行数据")
             current_page_count = 0
             
-            for row in sms_rows:
-                try:
-                    row_text = await row.inner_text()
-                    if '短信资质' in row_text:
-                        # 提取工单号并保存，而不是保存元素引用
-                        order_link = await row.query_selector('td.ant-table-cell a')
-                        if order_link:
-                            work_order_id = (await order_link.inner_text()).strip()
-                            if work_order_id and work_order_id not in work_order_ids:  # 避免重复
-                                work_order_ids.append(work_order_id)
-                                current_page_count += 1
-                                print(f"  ✓ 找到包含'短信资质'的行，工单号: {work_order_id}")
-                except Exception:
-                    continue
+            for work_order_id in rows_info['order_ids']:
+                if work_order_id and work_order_id not in work_order_ids:  # 避免重复
+                    work_order_ids.append(work_order_id)
+                    current_page_count += 1
+                    logger.debug(f"  ✓ 找到包含'短信资质'的行，工单号: {work_order_id}")
             
-            print(f"  第 {page_num} 页找到 {current_page_count} 个包含'短信资质'的工单")
+            logger.info(f"  第 {page_num} 页找到 {current_page_count} 个包含'短信资质'的工单")
             
             # 检查是否有下一页
             has_next_page = False
             try:
-                next_page_button = await page.query_selector('li.ant-pagination-next')
-                if next_page_button:
-                    # 检查是否被禁用
-                    is_disabled = await next_page_button.get_attribute('aria-disabled')
-                    has_disabled_class = await next_page_button.evaluate('el => el.classList.contains("ant-pagination-disabled")')
-                    
-                    if is_disabled != 'true' and not has_disabled_class:
-                        has_next_page = True
-                        print(f"  发现还有下一页，准备点击...")
+                # 下一页按钮的存在性和禁用状态在页面内一次判断
+                if await page.evaluate(_HAS_NEXT_PAGE_JS):
+                    has_next_page = True
+                    logger.info(f"  发现还有下一页，准备点击...")
             except Exception as e:
-                print(f"  检查下一页时出错: {e}")
+                logger.warning(f"  检查下一页时出错: {e}")
             
             # 如果没有下一页，退出循环
             if not has_next_page:
-                print(f"  已处理完所有页面，共找到 {len(work_order_ids)} 个包含'短信资质'的工单")
+                logger.info(f"  已处理完所有页面，共找到 {len(work_order_ids)} 个包含'短信资质'的工单")
                 break
             
             # 点击下一页
@@ -447,7 +450,7 @@ async def query_qualification_work_order(
                 if next_page_button:
                     await next_page_button.click()
                     page_num += 1
-                    print(f"  ✓ 已点击下一页，等待页面加载...")
+                    logger.info(f"  ✓ 已点击下一页，等待页面加载...")
                     # 等待下一页数据加载完成（增加等待时间）
                     await asyncio.sleep(3)  # 增加等待时间，确保数据加载完成
                     
@@ -455,12 +458,12 @@ async def query_qualification_work_order(
                     try:
                         await page.wait_for_selector('tr.ant-table-row', timeout=5000, state='visible')
                     except Exception:
-                        print(f"  ⚠ 等待表格行加载超时，继续处理...")
+                        logger.warning(f"  ⚠ 等待表格行加载超时，继续处理...")
                 else:
-                    print(f"  ⚠ 未找到下一页按钮，停止分页")
+                    logger.warning(f"  ⚠ 未找到下一页按钮，停止分页")
                     break
             except Exception as e:
-                print(f"  ✗ 点击下一页失败: {e}")
+                logger.warning(f"  ✗ 点击下一页失败: {e}")
                 break
         
         if not work_order_ids:
@@ -472,30 +475,21 @@ async def query_qualification_work_order(
                 'error': '未找到包含"短信资质"的行'
             }
         
-        print(f"共找到 {len(work_order_ids)} 个包含'短信资质'的工单，开始依次检查...")
+        logger.info(f"共找到 {len(work_order_ids)} 个包含'短信资质'的工单，开始依次检查...")
         
         # 步骤9-11: 对每个工单号，依次进入详情页面检查资质组ID
         for idx, work_order_id_to_check in enumerate(work_order_ids, 1):
-            print(f"\n--- 检查第 {idx}/{len(work_order_ids)} 个工单 ---")
+            logger.info(f"\n--- 检查第 {idx}/{len(work_order_ids)} 个工单 ---")
             
             # 1. 进入工单查询页面
-            print("正在进入工单查询页面...")
+            logger.info("正在进入工单查询页面...")
             await page.goto(QUALIFICATION_ORDER_QUERY_URL, timeout=timeout, wait_until='domcontentloaded')
-            await asyncio.sleep(1)
             
             # 2. 输入工单号并查询
-            print(f"正在输入工单号 {work_order_id_to_check} 并查询...")
+            logger.info(f"正在输入工单号 {work_order_id_to_check} 并查询...")
             try:
-                order_id_input = await page.wait_for_selector(
-                    SELECTORS['qualification_order_id_input'],
-                    timeout=timeout,
-                    state='visible'
-                )
-                await order_id_input.click()
-                await order_id_input.fill('')
-                await asyncio.sleep(0.2)
-                await order_id_input.fill(work_order_id_to_check)
-                await asyncio.sleep(0.3)
+                # Locator.fill 自动等待输入框可见且可操作（同时获取焦点），无需先 wait_for_selector 再点击
+                await page.locator(SELECTORS['qualification_order_id_input']).fill(work_order_id_to_check, timeout=timeout)
                 
                 # 3. 点击查询按钮（带重试逻辑）
                 success = await click_query_button_with_retry(
@@ -506,58 +500,56 @@ async def query_qualification_work_order(
                     delay_after=3
                 )
                 if not success:
-                    print(f"  ✗ 点击查询按钮失败，跳过工单号 {work_order_id_to_check}")
+                    logger.warning(f"  ✗ 点击查询按钮失败，跳过工单号 {work_order_id_to_check}")
                     continue
                 
                 # 4. 点击工单号链接进入详情页面（精确查询后应该只有一个结果）
-                print(f"正在点击工单号 {work_order_id_to_check} 进入详情页面...")
+                logger.info(f"正在点击工单号 {work_order_id_to_check} 进入详情页面...")
                 order_link = await page.wait_for_selector(
                     f'a:has-text("{work_order_id_to_check}")',
                     timeout=10000,
                     state='visible'
                 )
                 await order_link.click()
-                await asyncio.sleep(2)  # 等待详情页面加载
-                print(f"  ✓ 已进入工单号 {work_order_id_to_check} 的详情页面")
+                logger.info(f"  ✓ 已进入工单号 {work_order_id_to_check} 的详情页面")
             except Exception as e:
-                print(f"  ✗ 查询工单号 {work_order_id_to_check} 失败: {e}")
+                logger.warning(f"  ✗ 查询工单号 {work_order_id_to_check} 失败: {e}")
                 continue
             
             # 获取资质组ID
-            print("正在获取资质组ID...")
+            logger.info("正在获取资质组ID...")
             qualification_group_id = None
             try:
-                # 查找包含"资质组ID"的行
+                # 查找包含"资质组ID"的行（详情页面加载完成以该行出现为准，不再点击后固定等待2秒，超时相应延长）
                 qualification_group_row = await page.wait_for_selector(
                     'tr.ant-table-row:has-text("资质组ID")',
-                    timeout=5000,
+                    timeout=7000,
                     state='visible'
                 )
                 # 在同一行中查找pre标签（不依赖可变属性，直接查找pre标签）
                 qualification_group_pre = await qualification_group_row.query_selector('pre')
                 if qualification_group_pre:
                     qualification_group_id = (await qualification_group_pre.inner_text()).strip()
-                    print(f"  ✓ 获取到资质组ID: {qualification_group_id}")
+                    logger.info(f"  ✓ 获取到资质组ID: {qualification_group_id}")
                 else:
                     # 如果pre标签不存在，尝试查找其他可能包含ID的元素（如td中的文本）
-                    print("  ⚠ 未找到pre标签，尝试其他方式...")
-                    tds = await qualification_group_row.query_selector_all('td')
-                    for td in tds:
-                        td_text = (await td.inner_text()).strip()
+                    logger.warning("  ⚠ 未找到pre标签，尝试其他方式...")
+                    td_texts = await qualification_group_row.eval_on_selector_all('td', _CELL_TEXTS_JS)
+                    for td_text in td_texts:
                         if td_text and td_text.isdigit():
                             qualification_group_id = td_text
-                            print(f"  ✓ 从td中获取到资质组ID: {qualification_group_id}")
+                            logger.info(f"  ✓ 从td中获取到资质组ID: {qualification_group_id}")
                             break
                     if not qualification_group_id:
-                        print("  ⚠ 未找到资质组ID")
+                        logger.warning("  ⚠ 未找到资质组ID")
             except Exception as e:
-                print(f"  ✗ 获取资质组ID失败: {e}")
+                logger.warning(f"  ✗ 获取资质组ID失败: {e}")
             
             # 比较两个ID
             if qualification_group_id:
-                print(f"比较资质ID: 关联资质ID={qualification_id}, 资质组ID={qualification_group_id}")
+                logger.info(f"比较资质ID: 关联资质ID={qualification_id}, 资质组ID={qualification_group_id}")
                 if qualification_id == qualification_group_id:
-                    print(f"  ✓ 资质ID匹配！返回工单号: {work_order_id_to_check}")
+                    logger.info(f"  ✓ 资质ID匹配！返回工单号: {work_order_id_to_check}")
                     return {
                         'success': True,
                         'work_order_id': work_order_id_to_check,
@@ -566,12 +558,12 @@ async def query_qualification_work_order(
                         'error': None
                     }
                 else:
-                    print(f"  ✗ 资质ID不匹配，继续检查下一个工单")
+                    logger.info(f"  ✗ 资质ID不匹配，继续检查下一个工单")
             else:
-                print(f"  ⚠ 未能获取到资质组ID，继续检查下一个工单")
+                logger.warning(f"  ⚠ 未能获取到资质组ID，继续检查下一个工单")
         
         # 如果所有工单都检查完毕仍未找到匹配的
-        print(f"\n所有 {len(work_order_ids)} 个工单都已检查完毕，未找到匹配的资质ID")
+        logger.info(f"\n所有 {len(work_order_ids)} 个工单都已检查完毕，未找到匹配的资质ID")
         return {
             'success': False,
             'work_order_id': None,
@@ -582,7 +574,7 @@ async def query_qualification_work_order(
             
     except PlaywrightTimeoutError as e:
         error_msg = f"操作超时（超过 {timeout/1000} 秒）: {str(e)}"
-        print(f"错误: {error_msg}")
+        logger.error(f"错误: {error_msg}")
         return {
             'success': False,
             'work_order_id': None,
@@ -592,7 +584,7 @@ async def query_qualification_work_order(
         }
     except Exception as e:
         error_msg = f"查询过程中发生错误: {str(e)}"
-        print(f"错误: {error_msg}")
+        logger.error(f"错误: {error_msg}")
         return {
             'success': False,
             'work_order_id': None,
@@ -9,7 +9,7 @@
 """
 
 # 向后兼容：从新模块导入所有函数和常量
-from .sms_signature_query import query_sms_signature
+from .sms_signature_query import query_sms_signature, query_sms_signature_multi
 from .sms_success_rate_query import query_sms_success_rate, query_sms_success_rate_multi
 from .qualification_query import query_qualification_work_order
 from .constants import (
@@ -25,6 +25,7 @@ from .helpers import (
 
 __all__ = [
     'query_sms_signature',
+    'query_sms_signature_multi',
     'query_sms_success_rate',
     'query_sms_success_rate_multi',
     'query_qualification_work_order',
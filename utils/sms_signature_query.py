@@ -3,18 +3,104 @@
 提供短信签名查询功能
 """
 import asyncio
-from typing import Dict, Optional
-from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
+from typing import Callable, Dict, List, Optional
+from playwright.async_api import BrowserContext, Page, Locator, TimeoutError as PlaywrightTimeoutError
 
 from .constants import SIGN_QUERY_URL, SELECTORS
-from .helpers import extract_work_order_id, parse_datetime
+from .logger import get_logger
+
+try:
+    # 只导入模块本身，环境变量在首次访问配置项时才解析
+    import config as _config
+except ImportError:
+    _config = None
+
+# 控制台只输出 INFO 及以上级别，逐行匹配明细使用 DEBUG 级别，仅写入日志文件
+logger = get_logger('sms_signature')
+
+# 逐行明细日志只记录前若干行，结果行数很多时不再为每一行格式化日志
+_ROW_LOG_LIMIT = 20
+
+# 结果表格中的可见数据行（排除 aria-hidden 的占位行），模块加载时拼接一次
+_TABLE_ROW_VISIBLE = f"{SELECTORS['table_row']}:not([aria-hidden='true'])"
+
+# 签名查询接口（URL 中包含该片段），点击查询按钮后以其成功响应作为结果已返回的信号
+_SEARCH_API_KEYWORD = 'analyze_search'
+# 查询接口返回后确认结果行已渲染的等待时间（毫秒）；查询无结果时只等待该时长即进入备选流程
+_ROW_CONFIRM_TIMEOUT = 3000
+
+
+# 在页面内一次性提取结果表格所有行所需的数据（配合 Locator.evaluate_all 使用，参数为行元素数组），
+# 每行返回 work_order_id（优先取第十列中的数字，没有时取第一列，均没有时为 null）、
+# from_tenth（工单号是否来自第十列）、sign_name（第五列，签名名称）、modify_time（第三列，修改时间）及
+# modify_timestamp（在浏览器中解析的修改时间毫秒时间戳，无法解析时为 null）；缺少签名名称或修改时间列的行返回 null
+_EXTRACT_ROWS_JS = '''rows => rows.map(row => {
+    const cell = n => row.querySelector(`td.dumbo-antd-0-1-18-table-cell:nth-child(${n})`);
+    const signCell = cell(5);
+    const timeCell = cell(3);
+    if (!signCell || !timeCell) {
+        return null;
+    }
+    // 提取签名名称：从div.break-all中提取文本，去除复制按钮等图标
+    let signName;
+    const signDiv = signCell.querySelector("div.break-all");
+    if (signDiv) {
+        const clone = signDiv.cloneNode(true);
+        clone.querySelectorAll("svg, span.anticon").forEach(s => s.remove());
+        signName = clone.textContent.trim();
+    } else {
+        signName = signCell.innerText.trim();
+    }
+    // 工单号为连续数字，优先从第十列（主要）提取，没有时使用第一列（备选）
+    const digits = el => {
+        const match = el ? el.innerText.match(/\\d+/) : null;
+        return match ? match[0] : null;
+    };
+    const tenthId = digits(cell(10));
+    // 修改时间格式为 "YYYY-MM-DD HH:MM:SS"，替换为 ISO 格式后按本地时间解析
+    const modifyTime = timeCell.innerText.trim();
+    const modifyTimestamp = Date.parse(modifyTime.replace(" ", "T"));
+    return {
+        work_order_id: tenthId || digits(cell(1)),
+        from_tenth: tenthId !== null,
+        sign_name: signName,
+        modify_time: modifyTime,
+        modify_timestamp: Number.isNaN(modifyTimestamp) ? null : modifyTimestamp,
+    };
+})'''
+
+
+# 备选方法：按顺序在 [优先选择器, 备选选择器] 匹配的元素中查找第一个包含数字的文本，
+# 返回 {id, selector}，均未找到时返回 null
+_FIND_WORK_ORDER_JS = '''([primarySelector, fallbackSelector]) => {
+    const primary = document.querySelector(primarySelector);
+    const candidates = [
+        [primarySelector, primary ? [primary] : []],
+        [fallbackSelector, document.querySelectorAll(fallbackSelector)],
+    ];
+    for (const [selector, elements] of candidates) {
+        for (const el of elements) {
+            const match = (el.innerText || "").match(/\\d+/);
+            if (match) {
+                return {id: match[0], selector: selector};
+            }
+        }
+    }
+    return null;
+}'''
+
+
+def _is_search_response(response) -> bool:
+    """判断响应是否为签名查询接口的成功响应"""
+    return _SEARCH_API_KEYWORD in response.url and response.status == 200
 
 
 async def query_sms_signature(
     page: Page,
     pid: Optional[str] = None,
     sign_name: Optional[str] = None,
-    timeout: int = 30000
+    timeout: int = 30000,
+    locator: Optional[Callable[[str], Locator]] = None
 ) -> Dict[str, any]:
     """
     查询短信签名并获取工单号
@@ -24,13 +110,16 @@ async def query_sms_signature(
         pid: 客户PID（如果不提供，则从环境变量 SMS_PID 读取）
         sign_name: 签名名称（如果不提供，则从环境变量 SMS_SIGN_NAME 读取）
         timeout: 操作超时时间（毫秒），默认30秒
+        locator: 根据选择器返回 Locator 的函数（默认 page.locator），
+                 SMSQueryBase.locator 可在同一页面的多次查询间复用 Locator 对象
         
     Returns:
         Dict: 查询结果字典，包含以下字段：
             - success (bool): 是否查询成功
             - work_order_id (Optional[str]): 工单号（成功时返回，选择修改时间最新的）
             - error (Optional[str]): 错误信息（失败时返回）
-            - all_work_orders (Optional[List]): 所有找到的工单号列表（如果有多行）
+            - all_work_orders (Optional[List]): 所有找到的工单号列表（如果有多行，按修改时间从新到旧排列，
+              每项包含 work_order_id、modify_time、modify_timestamp（毫秒时间戳）、sign_name、row_index）
             - total_count (Optional[int]): 工单号总数
             
     # Example:
@@ -42,57 +131,59 @@ async def query_sms_signature(
     """
     # 如果未提供pid或sign_name，从环境变量读取
     if not pid or not sign_name:
-        try:
-            from config import SMS_PID, SMS_SIGN_NAME
-            
-            if not pid:
-                pid = SMS_PID
-            if not sign_name:
-                sign_name = SMS_SIGN_NAME
-            
-            if not pid or not sign_name:
-                return {
-                    'success': False,
-                    'work_order_id': None,
-                    'error': '客户PID和签名名称未提供，请在函数参数中传入或在环境变量中配置 SMS_PID 和 SMS_SIGN_NAME'
-                }
-        except ImportError:
-            if not pid or not sign_name:
-                return {
-                    'success': False,
-                    'work_order_id': None,
-                    'error': '客户PID和签名名称未提供，且无法从环境变量读取'
-                }
-    try:
-        # 1. 导航到查询页面
-        print(f"正在访问查询页面: {SIGN_QUERY_URL}")
-        await page.goto(SIGN_QUERY_URL, timeout=timeout, wait_until='domcontentloaded')
+        if _config is None:
+            return {
+                'success': False,
+                'work_order_id': None,
+                'error': '客户PID和签名名称未提供，且无法从环境变量读取'
+            }
         
-        # 2. 等待页面加载完成，确保客户PID输入框元素可见
-        await page.wait_for_selector(SELECTORS['partner_id'], timeout=timeout, state='visible')
+        pid = pid or _config.SMS_PID
+        sign_name = sign_name or _config.SMS_SIGN_NAME
         
-        # 3. 填写客户PID
-        print(f"正在填写客户PID: {pid}")
-        await page.fill(SELECTORS['partner_id'], pid)
-        await asyncio.sleep(0.5)  # 模拟人类操作，等待一下
+        if not pid or not sign_name:
+            return {
+                'success': False,
+                'work_order_id': None,
+                'error': '客户PID和签名名称未提供，请在函数参数中传入或在环境变量中配置 SMS_PID 和 SMS_SIGN_NAME'
+            }
+    if locator is None:
+        locator = page.locator
+    try:
+        # 1. 导航到查询页面（导航提交后即返回，不等待 DOMContentLoaded，页面是否就绪以下一步的输入框为准）
+        logger.info(f"正在访问查询页面: {SIGN_QUERY_URL}")
+        await page.goto(SIGN_QUERY_URL, timeout=timeout, wait_until='commit')
+
+        # 2-3. 填写客户PID：fill 会自动等待输入框可见且可操作，同时作为页面就绪的标志，
+        # 与文档剩余部分的加载重叠进行，无需再单独 wait_for 和固定延时
+        logger.info(f"正在填写客户PID: {pid}")
+        await locator(SELECTORS['partner_id']).fill(pid, timeout=timeout)
         
-        # 4. 填写签名名称
-        print(f"正在填写签名名称: {sign_name}")
-        await page.fill(SELECTORS['sign_name'], sign_name)
-        await asyncio.sleep(0.5)  # 模拟人类操作
+        # 4. 填写签名名称（两个输入框依次填写：fill 依赖输入焦点，并发填写可能把文本输入到另一个输入框）
+        logger.info(f"正在填写签名名称: {sign_name}")
+        await locator(SELECTORS['sign_name']).fill(sign_name, timeout=timeout)
         
         # 5. 触发查询（如果页面有查询按钮，可以点击；否则等待自动查询）
+        #    点击时等待签名查询接口返回，以接口响应而不是页面上已有的行作为结果已返回的信号
         try:
-            query_button = await page.query_selector('button:has-text("查 询"), button:has-text("搜 索")')
-            if query_button:
-                await query_button.click()
-                print("已点击查询按钮")
+            query_button = locator('button:has-text("查 询"), button:has-text("搜 索")').first
+            if await query_button.count():
+                logger.info("等待查询结果...")
+                try:
+                    async with page.expect_response(_is_search_response, timeout=timeout):
+                        await query_button.click()
+                    logger.info("已点击查询按钮，查询接口已返回")
+                except PlaywrightTimeoutError:
+                    logger.warning("等待查询接口响应超时，尝试继续提取...")
         except Exception:
             pass
         
-        # 6. 等待查询结果加载
-        print("等待查询结果...")
-        await asyncio.sleep(2)  # 等待查询完成
+        # 6. 确认结果行已渲染（只短暂等待，查询无结果时尽快进入备选流程）
+        visible_rows = locator(_TABLE_ROW_VISIBLE)
+        try:
+            await visible_rows.first.wait_for(timeout=_ROW_CONFIRM_TIMEOUT, state='attached')
+        except PlaywrightTimeoutError:
+            logger.warning("未找到结果表格数据行，尝试继续提取...")
         
         # 7. 提取工单号（支持多行，根据修改时间选择最新的）
         work_order_id = None
@@ -100,146 +191,90 @@ async def query_sms_signature(
         
         try:
             # 方法1: 优先尝试从表格中提取多行数据
-            print("尝试从表格中提取工单号...")
-            table_rows = await page.query_selector_all(
-                f"{SELECTORS['table_row']}:not([aria-hidden='true'])"
-            )
+            logger.info("尝试从表格中提取工单号...")
+            # 所有行的单元格文本在页面内一次提取，避免逐行逐个单元格往返
+            rows_cells = await visible_rows.evaluate_all(_EXTRACT_ROWS_JS)
             
-            if table_rows and len(table_rows) > 0:
-                print(f"找到 {len(table_rows)} 行数据")
+            if rows_cells:
+                logger.info(f"找到 {len(rows_cells)} 行数据")
                 
-                for idx, row in enumerate(table_rows):
-                    try:
-                        # 获取第一列（备选工单号）
-                        first_cell = await row.query_selector('td.dumbo-antd-0-1-18-table-cell:nth-child(1)')
-                        # 获取第十列（主要工单号）
-                        tenth_cell = await row.query_selector('td.dumbo-antd-0-1-18-table-cell:nth-child(10)')
-                        # 获取第二列（签名名称）
-                        second_cell = await row.query_selector('td.dumbo-antd-0-1-18-table-cell:nth-child(5)')
-                        # 获取第三列（修改时间）
-                        third_cell = await row.query_selector('td.dumbo-antd-0-1-18-table-cell:nth-child(3)')
-                        
-                        if second_cell and third_cell:
-                            # 优先从第十列提取工单号（主要工单号）
-                            work_order_text = None
-                            work_order_source = None
-                            
-                            if tenth_cell:
-                                tenth_text = await tenth_cell.inner_text()
-                                extracted_id_from_tenth = extract_work_order_id(tenth_text)
-                                if extracted_id_from_tenth:
-                                    work_order_text = tenth_text
-                                    work_order_source = "第十列（主要）"
-                            
-                            # 如果第十列不存在或没有工单号，使用第一列作为备选
-                            if not work_order_text and first_cell:
-                                first_text = await first_cell.inner_text()
-                                extracted_id_from_first = extract_work_order_id(first_text)
-                                if extracted_id_from_first:
-                                    work_order_text = first_text
-                                    work_order_source = "第一列（备选）"
-                            
-                            # 提取签名名称：从div.break-all中提取文本，去除复制按钮等图标
-                            sign_name_cell = await second_cell.query_selector('div.break-all')
-                            if sign_name_cell:
-                                # 获取div.break-all内的文本内容（不包括子元素如复制按钮）
-                                sign_name_text = await sign_name_cell.evaluate('''el => {
-                                    // 克隆元素以保留原始结构
-                                    const clone = el.cloneNode(true);
-                                    // 移除所有svg图标（复制按钮）
-                                    clone.querySelectorAll("svg, span.anticon").forEach(s => s.remove());
-                                    // 返回清理后的文本
-                                    return clone.textContent.trim();
-                                }''')
-                            else:
-                                # 如果没有div.break-all，直接获取单元格文本
-                                sign_name_text = await second_cell.inner_text()
-                            
-                            modify_time_text = await third_cell.inner_text()
-                            
-                            # 清理签名名称：去除空白字符
-                            sign_name_text = sign_name_text.strip() if sign_name_text else ""
-                            
-                            # 对签名名称进行完全匹配
-                            if sign_name_text != sign_name:
-                                print(f"  行 {idx+1}: 签名名称不匹配（期望: '{sign_name}', 实际: '{sign_name_text}'），跳过")
-                                continue
-                            
-                            # 如果找到了工单号，提取并保存
-                            if work_order_text:
-                                extracted_id = extract_work_order_id(work_order_text)
-                                modify_time = modify_time_text.strip()
-                                
-                                if extracted_id and modify_time:
-                                    work_order_data.append({
-                                        'work_order_id': extracted_id,
-                                        'modify_time': modify_time,
-                                        'sign_name': sign_name_text,
-                                        'row_index': idx
-                                    })
-                                    print(f"  行 {idx+1}: 工单号={extracted_id} ({work_order_source}), 签名名称={sign_name_text}, 修改时间={modify_time} [签名匹配]")
-                            else:
-                                print(f"  行 {idx+1}: 签名名称匹配但未找到工单号，跳过")
-                    except Exception as e:
-                        print(f"  处理第 {idx+1} 行时出错: {e}")
+                for idx, cells in enumerate(rows_cells):
+                    if not cells:
+                        continue
+                    
+                    # 工单号已在页面内提取（第十列优先，第一列备选），签名名称已去除首尾空白
+                    extracted_id = cells['work_order_id']
+                    work_order_source = "第十列（主要）" if cells['from_tenth'] else "第一列（备选）"
+                    sign_name_text = cells['sign_name']
+                    
+                    # 对签名名称进行完全匹配
+                    if sign_name_text != sign_name:
+                        if idx < _ROW_LOG_LIMIT:
+                            logger.debug(f"  行 {idx+1}: 签名名称不匹配（期望: '{sign_name}', 实际: '{sign_name_text}'），跳过")
                         continue
+                    
+                    # 如果找到了工单号，提取并保存
+                    if extracted_id:
+                        modify_time = cells['modify_time']
+                        
+                        if modify_time:
+                            work_order_data.append({
+                                'work_order_id': extracted_id,
+                                'modify_time': modify_time,
+                                'modify_timestamp': cells['modify_timestamp'],
+                                'sign_name': sign_name_text,
+                                'row_index': idx
+                            })
+                            if idx < _ROW_LOG_LIMIT:
+                                logger.debug(f"  行 {idx+1}: 工单号={extracted_id} ({work_order_source}), 签名名称={sign_name_text}, 修改时间={modify_time} [签名匹配]")
+                    elif idx < _ROW_LOG_LIMIT:
+                        logger.debug(f"  行 {idx+1}: 签名名称匹配但未找到工单号，跳过")
+                
+                if len(rows_cells) > _ROW_LOG_LIMIT:
+                    logger.debug(f"  其余 {len(rows_cells) - _ROW_LOG_LIMIT} 行的明细已省略")
                 
                 # 根据修改时间选择最新的工单号
                 if work_order_data:
-                    # 按修改时间排序（最新的在前）
-                    work_order_data.sort(
-                        key=lambda x: parse_datetime(x['modify_time']),
-                        reverse=True
-                    )
+                    # 多行时按修改时间排序（最新的在前），all_work_orders 按此顺序返回；
+                    # 时间戳已在浏览器中解析，无法解析的排在最后
+                    if len(work_order_data) > 1:
+                        work_order_data.sort(
+                            key=lambda x: x['modify_timestamp'] if x['modify_timestamp'] is not None else float('-inf'),
+                            reverse=True
+                        )
                     
                     work_order_id = work_order_data[0]['work_order_id']
                     latest_time = work_order_data[0]['modify_time']
-                    print(f"选择修改时间最新的工单号: {work_order_id} (修改时间: {latest_time})")
+                    logger.info(f"选择修改时间最新的工单号: {work_order_id} (修改时间: {latest_time})")
                     
                     if len(work_order_data) > 1:
-                        print(f"共找到 {len(work_order_data)} 个工单号，已选择最新的")
+                        logger.info(f"共找到 {len(work_order_data)} 个工单号，已选择最新的")
             
         except Exception as e:
-            print(f"从表格提取失败: {e}")
-        
+            logger.warning(f"从表格提取失败: {e}")
+
+        # 方法1 已收集到匹配的行但在排序/选择阶段出错时，直接使用已收集的数据，不再进入备选方法
+        if work_order_data and not work_order_id:
+            work_order_id = work_order_data[0]['work_order_id']
+            logger.info(f"使用表格中已提取的工单号: {work_order_id}")
+
         # 方法2: 如果表格方法失败，尝试原来的方法（兼容旧逻辑）
         if not work_order_id:
-            print("表格方法未找到工单号，尝试备选方法...")
+            logger.info("表格方法未找到工单号，尝试备选方法...")
             try:
-                # 优先检查 div.break-all（可能不在表格中）
-                primary_element = await page.wait_for_selector(
-                    SELECTORS['work_order_primary'],
-                    timeout=3000,
-                    state='visible'
+                # 优先检查 div.break-all（可能不在表格中），其次依次检查 td.dumbo-antd-0-1-18-table-cell，
+                # 两种选择器在页面内一次完成，不再等待 div.break-all 出现，也不再逐个元素读取文本
+                fallback = await page.evaluate(
+                    _FIND_WORK_ORDER_JS,
+                    [SELECTORS['work_order_primary'], SELECTORS['work_order_fallback']]
                 )
-                
-                if primary_element:
-                    work_order_text = await primary_element.inner_text()
-                    work_order_id = extract_work_order_id(work_order_text)
-                    
-                    if work_order_id:
-                        print(f"从 div.break-all 提取到工单号: {work_order_id}")
-                        
-            except PlaywrightTimeoutError:
-                # 如果找不到 div.break-all，尝试备选方案
-                print("未找到 div.break-all，尝试其他方法...")
-                
-                try:
-                    # 备选方案：检查 td.dumbo-antd-0-1-18-table-cell
-                    fallback_elements = await page.query_selector_all(SELECTORS['work_order_fallback'])
-                    
-                    if fallback_elements:
-                        # 遍历所有匹配的元素，找到包含数字的工单号
-                        for element in fallback_elements:
-                            text = await element.inner_text()
-                            extracted_id = extract_work_order_id(text)
-                            if extracted_id:
-                                work_order_id = extracted_id
-                                print(f"从 td.dumbo-antd-0-1-18-table-cell 提取到工单号: {work_order_id}")
-                                break
-                                
-                except Exception as e:
-                    print(f"备选选择器也未能找到工单号: {e}")
+                if fallback:
+                    work_order_id = fallback['id']
+                    logger.info(f"从 {fallback['selector']} 提取到工单号: {work_order_id}")
+                else:
+                    logger.warning("备选选择器也未能找到工单号")
+            except Exception as e:
+                logger.warning(f"备选选择器也未能找到工单号: {e}")
         
         # 检查是否成功提取到工单号
         if work_order_id:
@@ -264,7 +299,7 @@ async def query_sms_signature(
             
     except PlaywrightTimeoutError as e:
         error_msg = f"操作超时（超过 {timeout/1000} 秒）: {str(e)}"
-        print(f"错误: {error_msg}")
+        logger.error(f"错误: {error_msg}")
         return {
             'success': False,
             'work_order_id': None,
@@ -272,9 +307,57 @@ async def query_sms_signature(
         }
     except Exception as e:
         error_msg = f"查询过程中发生错误: {str(e)}"
-        print(f"错误: {error_msg}")
+        logger.error(f"错误: {error_msg}")
         return {
             'success': False,
             'work_order_id': None,
             'error': error_msg
         }
+
+
+async def query_sms_signature_multi(
+    context: BrowserContext,
+    queries: List[Dict[str, str]],
+    concurrency: int = 5,
+    timeout: int = 30000
+) -> List[Dict[str, any]]:
+    """
+    在同一浏览器上下文的多个页面中并发查询多组短信签名
+    
+    Args:
+        context: Playwright BrowserContext 对象（需要已登录的会话）
+        queries: 查询列表，每项为 {'pid': 客户PID, 'sign_name': 签名名称}
+        concurrency: 同时打开的查询页面数上限，默认5
+        timeout: 单次查询的操作超时时间（毫秒），默认30秒
+        
+    Returns:
+        List[Dict]: 与 queries 顺序一致的查询结果列表，每项格式同 query_sms_signature 的返回值
+                    （某项失败时该项 success 为 False，不影响其余查询）
+        
+    # Example:
+    #     >>> results = await query_sms_signature_multi(context, [
+    #     ...     {'pid': '100000103722927', 'sign_name': '国能e购'},
+    #     ...     {'pid': '100000103722928', 'sign_name': '其他签名'},
+    #     ... ])
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def _query_one(query: Dict[str, str]) -> Dict[str, any]:
+        async with semaphore:
+            try:
+                page = await context.new_page()
+            except Exception as e:
+                # 单个页面创建失败只影响该项查询，其余查询照常进行
+                error_msg = f"创建查询页面失败: {str(e)}"
+                logger.error(f"错误: {error_msg}")
+                return {
+                    'success': False,
+                    'work_order_id': None,
+                    'error': error_msg
+                }
+            try:
+                return await query_sms_signature(page, query.get('pid'), query.get('sign_name'), timeout)
+            finally:
+                await page.close()
+    
+    return await asyncio.gather(*(_query_one(query) for query in queries))
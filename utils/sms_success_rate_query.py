@@ -4,12 +4,200 @@
 """
 import asyncio
 import re
+import weakref
+from urllib.parse import unquote
 from typing import Dict, Optional, Tuple
-from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
+from playwright.async_api import BrowserContext, Page, TimeoutError as PlaywrightTimeoutError, expect
 
 from .constants import SUCCESS_RATE_QUERY_URL, SELECTORS
-from .helpers import extract_cell_text
+from .helpers import wait_for_xhr_idle
 from .logger import get_logger
+from .sms_signature_query import query_sms_signature
+
+try:
+    # 只导入模块本身，环境变量在首次访问配置项时才解析
+    import config as _config
+except ImportError:
+    _config = None
+
+# 控制台只输出 INFO 及以上级别，逐步骤的明细使用 DEBUG 级别，仅写入日志文件
+logger = get_logger('sms_success_rate')
+
+# 成功率数值（如 "99.12"），模块加载时编译一次
+_SUCCESS_RATE_RE = re.compile(r'\d+\.\d+')
+
+# 逐行明细日志只记录前若干行，结果行数很多时不再为每一行格式化日志
+_ROW_LOG_LIMIT = 20
+
+# 切换时间范围后SLS大盘拉取数据的请求（URL 中包含以下关键字之一的 XHR/fetch 请求）及等待其响应的超时时间（毫秒）
+_DATA_REQUEST_KEYWORDS = ('getlogs', 'query', 'logstore')
+_DATA_RESPONSE_TIMEOUT = 10000
+# 大盘的每个图表都会发出上述数据请求；"客户签名视角"表格自身的查询语句中包含以下字段名（在解码后的 URL 或请求体中查找）
+_TABLE_QUERY_KEYWORDS = ('signname',)
+# 表格数据请求返回后等待表格内容刷新的超时时间（毫秒）
+_TABLE_REFRESH_TIMEOUT = 5000
+
+# 正在进行的完整查询（键为 (pid, time_range, only_first)），相同查询并发到达时合并为一次
+_INFLIGHT_QUERIES: "Dict[Tuple[str, str, bool], asyncio.Task]" = {}
+
+# 每个页面最近一次找到的SLS iframe（页面关闭后自动释放）
+_SLS_FRAME_CACHE: "weakref.WeakKeyDictionary[Page, object]" = weakref.WeakKeyDictionary()
+
+# 在一组容器元素中按优先级查找候选选择器（配合 Locator.evaluate_all 使用，参数为选择器列表）：
+# 对每个选择器取文档顺序中第一个匹配的元素，可见则返回该选择器，均不满足时返回 null
+_FIND_VISIBLE_SELECTOR_JS = '''(containers, selectors) => {
+    const isVisible = el => {
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0 && getComputedStyle(el).visibility !== "hidden";
+    };
+    for (const selector of selectors) {
+        for (const container of containers) {
+            const el = container.querySelector(selector);
+            if (el) {
+                if (isVisible(el)) {
+                    return selector;
+                }
+                break;
+            }
+        }
+    }
+    return null;
+}'''
+
+# PID 筛选条件的值容器候选选择器（按优先级排列，命中的选择器会写入 DEBUG 日志，可据此调整顺序）
+_VALUE_CONTAINER_SELECTORS = [
+    'div.obviz-base-easy-select-value',
+    'div.obviz-base-easy-select-text-field',
+    '.obviz-base-easy-select-value',
+    '.obviz-base-easy-select-text-field',
+    'div[class*="easy-select-value"]',
+    'div[class*="easy-select-text"]',
+]
+
+# 判断输入框是否位于标签为 "pid" 的筛选条件容器内（配合 Locator.evaluate 使用）
+_IS_PID_INPUT_JS = '''el => {
+    const container = el.closest("div.obviz-base-easy-select-inner");
+    if (!container) return false;
+    const pidLabel = container.querySelector("span.obviz-base-filterText");
+    return Boolean(pidLabel) && pidLabel.textContent.trim().toLowerCase() === "pid";
+}'''
+
+# 直接设置输入框的值并派发 input/change 事件（配合 Locator.evaluate 使用，值作为参数传入，不拼接到脚本中）
+_SET_INPUT_VALUE_JS = '''(el, value) => {
+    el.value = value;
+    el.dispatchEvent(new Event('input', { bubbles: true }));
+    el.dispatchEvent(new Event('change', { bubbles: true }));
+}'''
+
+# 成功率表格的数据行
+_TABLE_ROW_SELECTOR = 'div.obviz-base-easyTable-body div.obviz-base-easyTable-row'
+
+# 成功率表格所有数据行的文本快照（配合 Locator.evaluate_all 使用，参数为行元素数组），用于判断切换时间范围后表格是否已刷新
+_TABLE_SNAPSHOT_JS = 'rows => rows.map(row => row.innerText).join("\\n")'
+
+# 判断成功率表格是否已刷新（配合 Frame.wait_for_function 使用，参数为 [行选择器, 切换前的快照]）：
+# 有数据行且文本与快照不同；切换前已显示的旧数据行不算刷新
+_TABLE_CHANGED_JS = '''([selector, snapshot]) => {
+    const rows = Array.from(document.querySelectorAll(selector));
+    return rows.length > 0 && rows.map(row => row.innerText).join("\\n") !== snapshot;
+}'''
+
+# 成功率表格的列：(结果字段名, 单元格索引)，按结果字典的字段顺序排列；未标注的为向后兼容的别名
+_TABLE_COLUMNS = (
+    ('pid', 0),
+    ('signname', 1),
+    ('sign_name', 1),  # 向后兼容
+    ('sms_type', 2),  # 短信类型
+    ('template_type', 2),  # 向后兼容
+    ('submit_count', 3),  # 提交量
+    ('total_sent', 3),  # 向后兼容
+    ('receipt_count', 4),  # 回执量
+    ('total_success', 4),  # 向后兼容
+    ('receipt_success_count', 5),  # 回执成功量
+    ('total_failed', 5),  # 向后兼容
+    ('receipt_rate', 6),  # 回执率
+    ('receipt_success_rate', 7),  # 回执成功率（用户要的关键字段）
+    ('success_rate', 7),  # 向后兼容
+    ('receipt_rate_10s', 8),  # 十秒回执率
+    ('receipt_rate_30s', 9),  # 三十秒回执率
+    ('receipt_rate_60s', 10),  # 六十秒回执率
+)
+_TABLE_COLUMN_COUNT = max(index for _, index in _TABLE_COLUMNS) + 1
+
+# 在页面内一次性提取成功率表格所有行的前 N 个单元格文本（配合 Locator.evaluate_all 使用，参数为行元素数组和列数）：
+# 优先使用非表头单元格（排除 hasFilter 类），不足 N 个时使用全部单元格；单元格文本优先取
+# table-m__split-container 中的内容并去除首尾空白；单元格仍不足 N 个的行返回 null
+_EXTRACT_TABLE_ROWS_JS = '''(rows, columnCount) => rows.map(row => {
+    let cells = row.querySelectorAll("div.obviz-base-easyTable-cell:not(.obviz-base-easyTable-cell-hasFilter)");
+    if (cells.length < columnCount) {
+        cells = row.querySelectorAll("div.obviz-base-easyTable-cell");
+    }
+    if (cells.length < columnCount) {
+        return null;
+    }
+    return Array.from(cells).slice(0, columnCount).map(cell => {
+        const span = cell.querySelector("div.table-m__split-container__67f567d5 span");
+        return (span || cell).innerText.trim();
+    });
+})'''
+
+# 在SLS iframe内一次性提取查询条件和输出内容区域的元素信息（调试用，配合 Frame.evaluate 使用）：
+# 筛选条件标签和输入框各取前20个，表格行取前50个（每行最多200字符），
+# 表格单元格取前100个中的非空单元格（优先取 table-m__split-container 中的文本，最多100字符）
+_IFRAME_ELEMENTS_JS = '''() => {
+    const all = selector => Array.from(document.querySelectorAll(selector));
+    const filterTexts = all("span.obviz-base-filterText");
+    const inputs = all("input");
+    const rows = all('div.obviz-base-easyTable-row, tr, div[class*="table"]');
+    const cells = all('div.obviz-base-easyTable-cell, td, div[class*="table-cell"]');
+    const cellText = cell => {
+        const span = cell.querySelector("div.table-m__split-container__67f567d5 span");
+        return (span || cell).innerText.trim();
+    };
+    return {
+        filter_count: filterTexts.length,
+        filter_texts: filterTexts.slice(0, 20).map(el => el.innerText),
+        input_count: inputs.length,
+        inputs: inputs.slice(0, 20).map(el => ({
+            type: el.getAttribute("type") || "text",
+            value: (el.getAttribute("value") || "").slice(0, 50),
+        })),
+        row_count: rows.length,
+        rows: rows.slice(0, 50).map(el => el.innerText.slice(0, 200)),
+        cell_count: cells.length,
+        cells: cells.slice(0, 100)
+            .map((el, idx) => ({index: idx + 1, text: cellText(el).slice(0, 100)}))
+            .filter(cell => cell.text),
+    };
+}'''
+
+# 一次性统计SLS iframe内输入框、筛选条件标签和可见元素的数量（判断内容是否已渲染，配合 Frame.evaluate 使用）：
+# 可见元素只需判断是否超过10个，数到11个即停止，不再对整个页面逐个计算样式
+_LOAD_PROGRESS_JS = '''() => {
+    const isVisible = el => {
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0 && getComputedStyle(el).visibility !== "hidden";
+    };
+    let visibleCount = 0;
+    for (const el of document.querySelectorAll("body *")) {
+        if (isVisible(el) && ++visibleCount > 10) break;
+    }
+    return {
+        input_count: document.querySelectorAll("input").length,
+        filter_count: document.querySelectorAll("span.obviz-base-filterText").length,
+        visible_count: visibleCount,
+    };
+}'''
+
+# 一次性读取当前滚动位置和最大滚动高度（配合 Frame.evaluate 使用）
+_SCROLL_METRICS_JS = '''() => ({
+    position: window.pageYOffset || document.documentElement.scrollTop || document.body.scrollTop,
+    max: Math.max(
+        document.body.scrollHeight, document.documentElement.scrollHeight,
+        document.body.offsetHeight, document.documentElement.offsetHeight,
+        document.body.clientHeight, document.documentElement.clientHeight
+    ),
+})'''
 
 
 async def _find_sls_iframe(page: Page):
@@ -22,13 +210,46 @@ async def _find_sls_iframe(page: Page):
     Returns:
         Frame: SLS iframe对象，如果未找到则返回None
     """
+    # 缓存的 iframe 未被移除且仍停留在 SLS 大盘地址时直接复用
+    cached = _SLS_FRAME_CACHE.get(page)
+    if cached is not None and not cached.is_detached() and _is_sls_frame(cached):
+        return cached
+    
     iframes = page.frames
     for frame in iframes:
-        if 'sls4service.console.aliyun.com' in frame.url and 'dashboard' in frame.url:
+        if _is_sls_frame(frame):
+            _SLS_FRAME_CACHE[page] = frame
             return frame
     return None
 
 
+def _is_sls_frame(frame) -> bool:
+    """判断 frame 是否为 SLS 大盘 iframe"""
+    return 'sls4service.console.aliyun.com' in frame.url and 'dashboard' in frame.url
+
+
+async def _wait_for_sls_iframe(page: Page, timeout: int = 15000):
+    """
+    等待SLS iframe出现（已存在时立即返回，否则等待其导航到 SLS 大盘地址）
+    
+    Args:
+        page: Playwright Page 对象
+        timeout: 超时时间（毫秒），默认15秒
+        
+    Returns:
+        Frame: SLS iframe对象，如果超时仍未出现则返回None
+    """
+    sls_frame = await _find_sls_iframe(page)
+    if sls_frame:
+        return sls_frame
+    try:
+        sls_frame = await page.wait_for_event('framenavigated', predicate=_is_sls_frame, timeout=timeout)
+    except PlaywrightTimeoutError:
+        return None
+    _SLS_FRAME_CACHE[page] = sls_frame
+    return sls_frame
+
+
 async def _wait_for_iframe_load(sls_frame, timeout: int = 15000):
     """
     等待SLS iframe加载完成
@@ -37,21 +258,21 @@ async def _wait_for_iframe_load(sls_frame, timeout: int = 15000):
         sls_frame: SLS iframe对象
         timeout: 超时时间（毫秒），默认15秒
     """
-    print("  - 等待SLS iframe加载完成...")
+    logger.info("  - 等待SLS iframe加载完成...")
     try:
         # 1. 等待DOM加载完成
         await sls_frame.wait_for_load_state('domcontentloaded', timeout=timeout)
-        print("    ✓ DOM加载完成")
+        logger.debug("    ✓ DOM加载完成")
         
         # 2. 等待网络请求完成（load状态）
         try:
             await sls_frame.wait_for_load_state('load', timeout=timeout)
-            print("    ✓ 页面资源加载完成")
+            logger.debug("    ✓ 页面资源加载完成")
         except Exception as e:
-            print(f"    ⚠ 等待load状态超时: {e}，继续执行...")
+            logger.warning(f"    ⚠ 等待load状态超时: {e}，继续执行...")
         
         # 3. 等待至少有一些可见元素出现（确保内容已渲染）
-        print("    - 等待关键元素出现...")
+        logger.debug("    - 等待关键元素出现...")
         max_retries = 10
         retry_count = 0
         elements_ready = False
@@ -59,16 +280,18 @@ async def _wait_for_iframe_load(sls_frame, timeout: int = 15000):
         while retry_count < max_retries and not elements_ready:
             try:
                 # 检查是否有任何可见的输入框或筛选条件
-                input_count = await sls_frame.locator('input').count()
-                filter_count = await sls_frame.locator('span.obviz-base-filterText').count()
-                visible_elements = await sls_frame.locator('body *:visible').count()
+                # 三项计数在页面内一次求值（可见元素数达到判定阈值后即停止统计）
+                counts = await sls_frame.evaluate(_LOAD_PROGRESS_JS)
+                input_count = counts['input_count']
+                filter_count = counts['filter_count']
+                visible_elements = counts['visible_count']
                 
-                print(f"    - 尝试 {retry_count + 1}/{max_retries}: 输入框={input_count}, 筛选条件={filter_count}, 可见元素={visible_elements}")
+                logger.debug(f"    - 尝试 {retry_count + 1}/{max_retries}: 输入框={input_count}, 筛选条件={filter_count}, 可见元素={visible_elements}")
                 
                 # 如果找到至少一些元素，认为页面已加载
                 if input_count > 0 or filter_count > 0 or visible_elements > 10:
                     elements_ready = True
-                    print(f"    ✓ 关键元素已出现（输入框: {input_count}, 筛选条件: {filter_count}）")
+                    logger.debug(f"    ✓ 关键元素已出现（输入框: {input_count}, 筛选条件: {filter_count}）")
                     break
                 
                 retry_count += 1
@@ -76,21 +299,24 @@ async def _wait_for_iframe_load(sls_frame, timeout: int = 15000):
                     await asyncio.sleep(1)  # 等待1秒后重试
                     
             except Exception as e:
-                print(f"    ⚠ 检查元素时出错: {e}")
+                logger.warning(f"    ⚠ 检查元素时出错: {e}")
                 retry_count += 1
                 if retry_count < max_retries:
                     await asyncio.sleep(1)
         
         if not elements_ready:
-            print("    ⚠ 等待关键元素超时，但继续尝试查找PID输入框...")
+            logger.warning("    ⚠ 等待关键元素超时，但继续尝试查找PID输入框...")
         
-        # 4. 额外等待一段时间，确保JavaScript已执行
-        await asyncio.sleep(2)
-        print("    ✓ 等待完成，开始查找PID输入框")
+        # 4. 等待筛选条件标签出现（PID输入框位于筛选条件中），不再固定等待
+        try:
+            await sls_frame.wait_for_selector('span.obviz-base-filterText', timeout=timeout, state='attached')
+        except PlaywrightTimeoutError:
+            logger.warning("    ⚠ 等待筛选条件超时，继续执行...")
+        logger.debug("    ✓ 等待完成，开始查找PID输入框")
         
     except Exception as e:
-        print(f"  ⚠ SLS iframe加载过程中出错: {type(e).__name__} - {str(e)}")
-        print("    继续尝试查找PID输入框...")
+        logger.warning(f"  ⚠ SLS iframe加载过程中出错: {type(e).__name__} - {str(e)}")
+        logger.warning("    继续尝试查找PID输入框...")
 
 
 async def _scroll_to_bottom(sls_frame):
@@ -100,7 +326,7 @@ async def _scroll_to_bottom(sls_frame):
     Args:
         sls_frame: SLS iframe对象
     """
-    print("  - 滚动页面到底部...")
+    logger.info("  - 滚动页面到底部...")
     try:
         # 方法1: 滚动到页面底部
         await sls_frame.evaluate('window.scrollTo(0, document.body.scrollHeight)')
@@ -112,7 +338,7 @@ async def _scroll_to_bottom(sls_frame):
             if await title_locator.count() > 0:
                 await title_locator.first.scroll_into_view_if_needed()
                 await asyncio.sleep(1)  # 等待滚动完成
-                print("  ✓ 已滚动到表格元素")
+                logger.info("  ✓ 已滚动到表格元素")
         except Exception:
             pass
         
@@ -121,16 +347,126 @@ async def _scroll_to_bottom(sls_frame):
         await asyncio.sleep(1)  # 等待滚动和内容渲染完成
         
         # 验证滚动位置
-        scroll_position = await sls_frame.evaluate('window.pageYOffset || document.documentElement.scrollTop || document.body.scrollTop')
-        max_scroll = await sls_frame.evaluate('Math.max(document.body.scrollHeight, document.documentElement.scrollHeight, document.body.offsetHeight, document.documentElement.offsetHeight, document.body.clientHeight, document.documentElement.clientHeight)')
+        metrics = await sls_frame.evaluate(_SCROLL_METRICS_JS)
+        scroll_position = metrics['position']
+        max_scroll = metrics['max']
         
         # 如果位置是0但最大滚动也很小，说明页面不需要滚动
         if scroll_position == 0 and max_scroll <= 100:
-            print(f"  ✓ 页面内容已完全可见（无需滚动，内容高度: {max_scroll}）")
+            logger.info(f"  ✓ 页面内容已完全可见（无需滚动，内容高度: {max_scroll}）")
         else:
-            print(f"  ✓ 已滚动到页面底部（位置: {scroll_position}, 最大: {max_scroll}）")
+            logger.info(f"  ✓ 已滚动到页面底部（位置: {scroll_position}, 最大: {max_scroll}）")
     except Exception as e:
-        print(f"  ⚠ 滚动页面时出错: {e}")
+        logger.warning(f"  ⚠ 滚动页面时出错: {e}")
+
+
+async def _probe_locator(locator, require_visible: bool = True) -> bool:
+    """
+    判断定位器是否匹配到元素（出错时视为未匹配）
+    
+    Args:
+        locator: Playwright Locator 对象
+        require_visible: 是否还要求元素可见
+        
+    Returns:
+        bool: 是否匹配
+    """
+    try:
+        # is_visible 在没有匹配元素时直接返回 False，无需先 count 再判断可见（一次往返）
+        if require_visible:
+            return await locator.is_visible()
+        return await locator.count() > 0
+    except Exception:
+        return False
+
+
+async def _wait_for_value(locator, expected: str, timeout: int = 2000) -> str:
+    """
+    等待输入框的值变为期望值（一致即返回，超时不抛出异常）
+    
+    Args:
+        locator: 输入框的 Locator 对象
+        expected: 期望的值
+        timeout: 最长等待时间（毫秒），默认2秒
+        
+    Returns:
+        str: 输入框当前的值
+    """
+    try:
+        await expect(locator).to_have_value(expected, timeout=timeout)
+    except AssertionError:
+        pass
+    return await locator.input_value()
+
+
+def _is_data_response(response) -> bool:
+    """判断响应是否为SLS大盘拉取查询数据的成功响应"""
+    return (
+        response.request.resource_type in ('xhr', 'fetch')
+        and response.ok
+        and any(keyword in response.url.lower() for keyword in _DATA_REQUEST_KEYWORDS)
+    )
+
+
+def _is_table_data_response(response) -> bool:
+    """判断响应是否为"客户签名视角"表格自身查询数据的成功响应（其他图表的数据请求不算）"""
+    if not _is_data_response(response):
+        return False
+    try:
+        post_data = response.request.post_data or ''
+    except Exception:
+        post_data = ''
+    text = f"{unquote(response.url)} {unquote(post_data)}"
+    return any(keyword in text for keyword in _TABLE_QUERY_KEYWORDS)
+
+
+async def _snapshot_table(sls_frame) -> str:
+    """获取成功率表格当前所有数据行的文本（出错时返回空字符串）"""
+    try:
+        return await sls_frame.locator(_TABLE_ROW_SELECTOR).evaluate_all(_TABLE_SNAPSHOT_JS)
+    except Exception:
+        return ''
+
+
+async def _wait_for_table_change(sls_frame, snapshot: str, timeout: int = _TABLE_REFRESH_TIMEOUT) -> bool:
+    """
+    等待成功率表格刷新：出现数据行且内容与切换前的快照不同（超时则继续）
+    
+    Args:
+        sls_frame: SLS iframe对象
+        snapshot: 切换时间范围前由 _snapshot_table 获取的表格快照
+        timeout: 超时时间（毫秒）
+        
+    Returns:
+        bool: 表格是否已刷新（超时返回False，例如两个时间范围的数据恰好相同）
+    """
+    try:
+        await sls_frame.wait_for_function(
+            _TABLE_CHANGED_JS, arg=[_TABLE_ROW_SELECTOR, snapshot], polling=100, timeout=timeout
+        )
+        return True
+    except PlaywrightTimeoutError:
+        logger.warning("  ⚠ 等待表格数据刷新超时（数据可能与切换前相同），继续执行...")
+        return False
+
+
+async def _wait_for_table_rows(sls_frame, timeout: int = 5000) -> bool:
+    """
+    等待成功率表格的数据行出现（出现即返回，超时则继续提取）
+    
+    Args:
+        sls_frame: SLS iframe对象
+        timeout: 超时时间（毫秒）
+        
+    Returns:
+        bool: 数据行是否已出现
+    """
+    try:
+        await sls_frame.locator(_TABLE_ROW_SELECTOR).first.wait_for(state='visible', timeout=timeout)
+        return True
+    except PlaywrightTimeoutError:
+        logger.warning("  ⚠ 等待表格数据行出现超时，继续提取...")
+        return False
 
 
 async def _select_time_range(
@@ -166,68 +502,75 @@ async def _select_time_range(
     try:
         # 在SLS iframe中查找时间选择器
         time_selector_locator = None
-        print("  - 在SLS iframe中查找时间选择器...")
+        logger.info("  - 在SLS iframe中查找时间选择器...")
         try:
             time_selector = sls_frame.locator('div[data-spm-click*="time"]').first
-            if await time_selector.count() > 0:
-                is_visible = await time_selector.is_visible()
-                if is_visible:
-                    time_selector_locator = time_selector
-                    print(f"  ✓ 在SLS iframe中找到时间选择器")
+            if await time_selector.is_visible():
+                time_selector_locator = time_selector
+                logger.info(f"  ✓ 在SLS iframe中找到时间选择器")
         except Exception as e:
-            print(f"  ✗ 在SLS iframe中查找时间选择器失败: {e}")
+            logger.warning(f"  ✗ 在SLS iframe中查找时间选择器失败: {e}")
         
         if not time_selector_locator:
             return (False, sls_frame, '未找到时间选择器')
         
         # 点击时间选择器按钮
-        print("  - 点击时间选择器按钮...")
+        logger.info("  - 点击时间选择器按钮...")
         await time_selector_locator.click()
-        await asyncio.sleep(1)  # 等待弹窗出现
+        # 等待弹窗中的选项出现（出现即继续；超时则继续按文本查找）
+        try:
+            await sls_frame.locator('li.obviz-base-li-block').first.wait_for(state='visible', timeout=3000)
+        except PlaywrightTimeoutError:
+            logger.warning("  ⚠ 等待时间范围选项出现超时，继续查找...")
         
         # 查找并点击时间范围选项
-        print(f"  - 在SLS iframe中查找'{time_range}'选项...")
+        logger.info(f"  - 在SLS iframe中查找'{time_range}'选项...")
         time_option_locator = None
         search_texts = time_range_map.get(time_range, [time_range])
         
-        for search_text in search_texts:
-            try:
-                # 方式1: 使用has-text查找
-                option_locator = sls_frame.locator(f'li.obviz-base-li-block:has-text("{search_text}")').first
-                if await option_locator.count() > 0:
-                    is_visible = await option_locator.is_visible()
-                    if is_visible:
-                        time_option_locator = option_locator
-                        print(f"  ✓ 在SLS iframe中找到'{search_text}'选项")
-                        break
-            except Exception:
-                pass
-        
-        # 如果方式1失败，尝试使用text=查找
+        # 方式1: 使用has-text查找（所有候选文本同时探测，再按优先级取第一个可见的选项）
+        option_locators = [
+            sls_frame.locator(f'li.obviz-base-li-block:has-text("{search_text}")').first
+            for search_text in search_texts
+        ]
+        found = await asyncio.gather(*(_probe_locator(locator) for locator in option_locators))
+        for search_text, option_locator, matched in zip(search_texts, option_locators, found):
+            if matched:
+                time_option_locator = option_locator
+                logger.info(f"  ✓ 在SLS iframe中找到'{search_text}'选项")
+                break
+        
+        # 如果方式1失败，尝试使用text=查找（同样同时探测，不要求可见）
         if not time_option_locator:
-            for search_text in search_texts:
-                try:
-                    option_locator = sls_frame.locator(f'text={search_text}').first
-                    if await option_locator.count() > 0:
-                        time_option_locator = option_locator
-                        print(f"  ✓ 在SLS iframe中通过文本找到'{search_text}'选项")
-                        break
-                except Exception:
-                    pass
+            option_locators = [sls_frame.locator(f'text={search_text}').first for search_text in search_texts]
+            found = await asyncio.gather(
+                *(_probe_locator(locator, require_visible=False) for locator in option_locators)
+            )
+            for search_text, option_locator, matched in zip(search_texts, option_locators, found):
+                if matched:
+                    time_option_locator = option_locator
+                    logger.info(f"  ✓ 在SLS iframe中通过文本找到'{search_text}'选项")
+                    break
         
         if not time_option_locator:
             return (False, sls_frame, f"未找到时间范围选项：{time_range}")
         
-        # 点击时间范围选项
-        print(f"  - 点击'{time_range}'选项...")
-        await time_option_locator.click()
-        await asyncio.sleep(3 if need_reacquire_frame else 2)  # 切换时间范围需要更长的等待时间
-        print(f"  ✓ 已选择时间范围：{time_range}")
+        # 记录切换前的表格内容，切换后据此判断表格是否已刷新（切换前已显示的旧数据行不算新数据）
+        table_snapshot = await _snapshot_table(sls_frame)
+        
+        # 点击时间范围选项，并等待表格自身的数据请求返回（其他图表的数据请求不算，不再固定等待2~3秒）
+        logger.info(f"  - 点击'{time_range}'选项...")
+        try:
+            async with sls_frame.page.expect_response(_is_table_data_response, timeout=_DATA_RESPONSE_TIMEOUT):
+                await time_option_locator.click()
+            logger.debug("  ✓ 表格数据请求已返回")
+        except PlaywrightTimeoutError:
+            logger.warning("  ⚠ 未等到表格数据请求的响应，继续执行...")
+        logger.info(f"  ✓ 已选择时间范围：{time_range}")
         
         # 如果需要重新获取iframe引用（切换时间范围后iframe可能重新加载）
         if need_reacquire_frame and page:
-            print("  - 重新获取SLS iframe引用（切换时间范围后可能重新加载）...")
-            await asyncio.sleep(2)  # 等待iframe重新加载
+            logger.info("  - 重新获取SLS iframe引用（切换时间范围后可能重新加载）...")
             
             # 重新查找SLS iframe
             updated_sls_frame = await _find_sls_iframe(page)
@@ -238,14 +581,16 @@ async def _select_time_range(
             # 等待iframe重新加载完成
             try:
                 await updated_sls_frame.wait_for_load_state('domcontentloaded', timeout=10000)
-                print("  ✓ SLS iframe重新加载完成")
-                await asyncio.sleep(2)  # 额外等待，确保内容渲染完成
+                logger.info("  ✓ SLS iframe重新加载完成")
             except Exception as e:
-                print(f"  ⚠ 等待iframe加载时出错: {e}，继续执行...")
-                await asyncio.sleep(2)
+                logger.warning(f"  ⚠ 等待iframe加载时出错: {e}，继续执行...")
             
             sls_frame = updated_sls_frame
         
+        # 等待表格内容变为新时间范围的数据
+        if await _wait_for_table_change(sls_frame, table_snapshot):
+            logger.debug("  ✓ 表格数据已刷新")
+        
         # 滚动页面到底部，确保表格内容完全可见
         await _scroll_to_bottom(sls_frame)
         
@@ -253,12 +598,13 @@ async def _select_time_range(
         
     except Exception as e:
         error_msg = f"选择时间范围时出错: {str(e)}"
-        print(f"  ✗ {error_msg}")
+        logger.warning(f"  ✗ {error_msg}")
         return (False, sls_frame, error_msg)
 async def _extract_table_data(
     sls_frame,
     pid: Optional[str],
-    time_range: str
+    time_range: str,
+    only_first: bool = False
 ) -> Dict[str, any]:
     """
     从SLS iframe的表格中提取数据
@@ -267,6 +613,8 @@ async def _extract_table_data(
         sls_frame: SLS iframe对象
         pid: 客户PID（用于匹配数据）
         time_range: 时间范围（用于错误信息）
+        only_first: 是否在得到成功率后立即停止（提供PID时为第一条匹配行，否则为第一条数据行），
+                    此时 all_data 只包含已处理的行
         
     Returns:
         Dict: 包含以下字段：
@@ -281,7 +629,7 @@ async def _extract_table_data(
     
     try:
         # 在SLS iframe中查找"客户签名视角 -剔除重试过程"表格
-        print("  - 在SLS iframe中查找'客户签名视角 -剔除重试过程'表格...")
+        logger.info("  - 在SLS iframe中查找'客户签名视角 -剔除重试过程'表格...")
         
         try:
             # 直接使用定位器查找包含"客户签名视角 -剔除重试过程"标题的元素
@@ -289,153 +637,81 @@ async def _extract_table_data(
             title_count = await title_locator.count()
             
             if title_count > 0:
-                print(f"  ✓ 找到标题元素")
-                # 找到标题元素后，直接使用通用选择器查找表格行
-                print("  - 使用通用选择器查找表格行...")
-                table_rows = await sls_frame.query_selector_all('div.obviz-base-easyTable-body div.obviz-base-easyTable-row')
+                logger.info(f"  ✓ 找到标题元素")
             else:
-                print(f"  ⚠ 未找到标题元素")
-                table_rows = []
+                logger.warning(f"  ⚠ 未找到标题元素")
         except Exception as e:
-            print(f"  ⚠ 查找标题元素时出错: {e}")
-            table_rows = []
+            logger.warning(f"  ⚠ 查找标题元素时出错: {e}")
         
-        # 如果找到了表格行，继续处理
-        if not table_rows:
-            print("  ⚠ 未找到表格行，尝试使用通用选择器查找...")
-            # 使用 query_selector_all 获取 ElementHandle 列表
-            table_rows = await sls_frame.query_selector_all('div.obviz-base-easyTable-body div.obviz-base-easyTable-row')
+        # 使用通用选择器查找表格行，所有行的单元格文本在页面内一次提取，避免逐行逐个单元格往返
+        logger.info("  - 使用通用选择器查找表格行...")
+        table_rows = await sls_frame.locator(_TABLE_ROW_SELECTOR).evaluate_all(_EXTRACT_TABLE_ROWS_JS, _TABLE_COLUMN_COUNT)
         
-        if table_rows and len(table_rows) > 0:
-            print(f"  ✓ 找到 {len(table_rows)} 行数据")
+        if table_rows:
+            logger.info(f"  ✓ 找到 {len(table_rows)} 行数据")
             
-            for idx, row in enumerate(table_rows):
-                try:
-                    # 获取该行的所有单元格（row 是 ElementHandle）
-                    # 首先尝试排除表头单元格（hasFilter类）
-                    cells = await row.query_selector_all('div.obviz-base-easyTable-cell:not(.obviz-base-easyTable-cell-hasFilter)')
-                    
-                    # 如果排除后单元格数量不足11个，则获取所有单元格（可能是数据行）
-                    if not cells or len(cells) < 11:
-                        cells = await row.query_selector_all('div.obviz-base-easyTable-cell')
-                    
-                    # 确保有足够的单元格（至少11个：pid, signname, 短信类型, 提交量, 回执量, 回执成功量, 回执率, 回执成功率, 十秒回执率, 三十秒回执率, 六十秒回执率）
-                    if cells and len(cells) >= 11:
-                        row_data = {}
-                        try:
-                            # 提取所有单元格的文本用于调试
-                            cell_texts = []
-                            for cell in cells[:11]:
-                                cell_text = await extract_cell_text(cell)
-                                cell_texts.append(cell_text.strip())
-                            
-                            # 验证是否是表头行（表头通常包含"pid", "signname"等文本）
-                            if len(cell_texts) > 0 and (cell_texts[0].lower() in ['pid', '客户pid'] or 
-                                                         cell_texts[1].lower() in ['signname', '签名']):
-                                print(f"  跳过表头行 {idx+1}")
-                                continue
-                            
-                            # 使用helpers中的extract_cell_text函数提取数据
-                            # 单元格索引对应关系：
-                            # 0: pid, 1: signname, 2: 短信类型, 3: 提交量, 4: 回执量, 
-                            # 5: 回执成功量, 6: 回执率, 7: 回执成功率, 8: 十秒回执率, 
-                            # 9: 三十秒回执率, 10: 六十秒回执率
-                            
-                            cell1_text = cell_texts[0] if len(cell_texts) > 0 else ''
-                            row_data['pid'] = cell1_text
-                            
-                            cell2_text = cell_texts[1] if len(cell_texts) > 1 else ''
-                            row_data['signname'] = cell2_text
-                            row_data['sign_name'] = row_data['signname']  # 向后兼容
-                            
-                            cell3_text = cell_texts[2] if len(cell_texts) > 2 else ''
-                            row_data['sms_type'] = cell3_text
-                            row_data['template_type'] = row_data['sms_type']  # 向后兼容
-                            
-                            cell4_text = cell_texts[3] if len(cell_texts) > 3 else ''
-                            row_data['submit_count'] = cell4_text
-                            row_data['total_sent'] = row_data['submit_count']  # 向后兼容
-                            
-                            cell5_text = cell_texts[4] if len(cell_texts) > 4 else ''
-                            row_data['receipt_count'] = cell5_text
-                            row_data['total_success'] = row_data['receipt_count']  # 向后兼容
-                            
-                            cell6_text = cell_texts[5] if len(cell_texts) > 5 else ''
-                            row_data['receipt_success_count'] = cell6_text
-                            row_data['total_failed'] = row_data['receipt_success_count']  # 向后兼容
-                            
-                            cell7_text = cell_texts[6] if len(cell_texts) > 6 else ''
-                            row_data['receipt_rate'] = cell7_text
-                            
-                            # 第8个单元格（索引7）是回执成功率 - 这是用户要的关键字段
-                            cell8_text = cell_texts[7] if len(cell_texts) > 7 else ''
-                            row_data['receipt_success_rate'] = cell8_text
-                            row_data['success_rate'] = row_data['receipt_success_rate']  # 向后兼容
-                            
-                            cell9_text = cell_texts[8] if len(cell_texts) > 8 else ''
-                            row_data['receipt_rate_10s'] = cell9_text
-                            
-                            cell10_text = cell_texts[9] if len(cell_texts) > 9 else ''
-                            row_data['receipt_rate_30s'] = cell10_text
-                            
-                            cell11_text = cell_texts[10] if len(cell_texts) > 10 else ''
-                            row_data['receipt_rate_60s'] = cell11_text
-                            
-                            all_data.append(row_data)
-                            
-                            # 检查PID是否匹配（如果提供了PID参数）
-                            if pid:
-                                row_pid = row_data.get('pid', '').strip()
-                                if row_pid == pid:
-                                    matched_data.append(row_data)
-                                    print(f"  ✓ 行 {idx+1}: signname={row_data.get('signname', 'N/A')}, "
-                                          f"回执成功率={row_data.get('receipt_success_rate', 'N/A')}%, "
-                                          f"PID={row_data.get('pid', '')}, 类型={row_data.get('sms_type', '')} [PID匹配]")
-                                else:
-                                    print(f"  - 行 {idx+1}: signname={row_data.get('signname', 'N/A')}, "
-                                          f"回执成功率={row_data.get('receipt_success_rate', 'N/A')}%, "
-                                          f"PID={row_data.get('pid', '')}, 类型={row_data.get('sms_type', '')} [PID不匹配]")
-                            else:
-                                # 如果没有提供PID，显示所有数据
-                                print(f"  ✓ 行 {idx+1}: signname={row_data.get('signname', 'N/A')}, "
-                                      f"回执成功率={row_data.get('receipt_success_rate', 'N/A')}%, "
-                                      f"PID={row_data.get('pid', '')}, 类型={row_data.get('sms_type', '')}")
-                        except Exception as e:
-                            print(f"  ✗ 处理第 {idx+1} 行时出错: {type(e).__name__} - {str(e)}")
-                            import traceback
-                            traceback.print_exc()
-                            continue
-                    else:
-                        # 单元格数量不足的行可能是表头行或特殊行，静默跳过
-                        # 只在调试模式下打印警告
-                        pass
-                except Exception as e:
-                    print(f"  ✗ 解析第 {idx+1} 行时出错: {type(e).__name__} - {str(e)}")
+            for idx, cell_texts in enumerate(table_rows):
+                # 单元格数量不足的行可能是表头行或特殊行，静默跳过
+                if not cell_texts:
+                    continue
+                
+                # 验证是否是表头行（表头通常包含"pid", "signname"等文本）
+                if cell_texts[0].lower() in ['pid', '客户pid'] or cell_texts[1].lower() in ['signname', '签名']:
+                    if idx < _ROW_LOG_LIMIT:
+                        logger.debug(f"  跳过表头行 {idx+1}")
                     continue
+                
+                # 按列表将单元格文本映射为结果字段（列定义见 _TABLE_COLUMNS）
+                row_data = {key: cell_texts[index] for key, index in _TABLE_COLUMNS}
+                all_data.append(row_data)
+                
+                # 检查PID是否匹配（如果提供了PID参数）
+                if pid:
+                    if row_data['pid'] == pid:
+                        matched_data.append(row_data)
+                        row_mark, row_note = "✓", " [PID匹配]"
+                    else:
+                        row_mark, row_note = "-", " [PID不匹配]"
+                else:
+                    # 如果没有提供PID，显示所有数据
+                    row_mark, row_note = "✓", ""
+                if idx < _ROW_LOG_LIMIT:
+                    logger.debug(f"  {row_mark} 行 {idx+1}: signname={row_data['signname']}, "
+                                 f"回执成功率={row_data['receipt_success_rate']}%, "
+                                 f"PID={row_data['pid']}, 类型={row_data['sms_type']}{row_note}")
+                
+                # 只需要成功率时，得到第一条可用的数据行后不再处理其余行
+                if only_first and (matched_data or not pid):
+                    logger.debug(f"  已得到成功率，跳过其余 {len(table_rows) - idx - 1} 行")
+                    break
+            
+            if not only_first and len(table_rows) > _ROW_LOG_LIMIT:
+                logger.debug(f"  其余 {len(table_rows) - _ROW_LOG_LIMIT} 行的明细已省略")
         else:
             # 如果没有找到表格行，尝试其他方式提取成功率
             try:
-                success_rate_elements = await sls_frame.query_selector_all(SELECTORS['success_rate_value'])
-                for element in success_rate_elements:
-                    text = await element.inner_text()
-                    if re.match(r'^\d+\.\d+$', text.strip()):
-                        success_rate = text.strip()
-                        print(f"找到成功率: {success_rate}%")
+                # 所有候选元素的文本一次取回，不再逐个 ElementHandle 读取
+                success_rate_texts = await sls_frame.locator(SELECTORS['success_rate_value']).all_inner_texts()
+                for text in success_rate_texts:
+                    text = text.strip()
+                    if _SUCCESS_RATE_RE.fullmatch(text):
+                        success_rate = text
+                        logger.info(f"找到成功率: {success_rate}%")
                         break
             except Exception as e:
-                print(f"尝试其他方式提取成功率时出错: {e}")
+                logger.warning(f"尝试其他方式提取成功率时出错: {e}")
         
         # 确定返回的数据和成功率
         # 如果提供了PID且有匹配的数据，优先使用匹配的数据
         if pid and matched_data:
-            print(f"\n  ✓ 找到 {len(matched_data)} 条PID匹配的数据（PID: {pid}）")
+            logger.info(f"\n  ✓ 找到 {len(matched_data)} 条PID匹配的数据（PID: {pid}）")
             # 使用匹配数据的第一条作为主要成功率（或者可以计算平均值）
             success_rate = matched_data[0].get('receipt_success_rate', '')
-            print(f"  ✓ 使用PID匹配数据的成功率: {success_rate}%")
+            logger.info(f"  ✓ 使用PID匹配数据的成功率: {success_rate}%")
         elif all_data:
             # 如果没有匹配的数据，使用所有数据
             if pid:
-                print(f"\n  ⚠ 未找到PID匹配的数据（PID: {pid}），使用所有数据")
+                logger.warning(f"\n  ⚠ 未找到PID匹配的数据（PID: {pid}），使用所有数据")
             success_rate = all_data[0].get('receipt_success_rate', '') if all_data else None
         
         return {
@@ -454,11 +730,69 @@ async def _extract_table_data(
         }
 
 
+async def _log_iframe_elements(sls_frame, pid: Optional[str], time_range: str):
+    """
+    打印SLS iframe中的所有元素（用于判断查询条件和输出内容），并保存到专门的日志文件
+    
+    所有元素的文本和属性在页面内一次提取，不再逐个元素读取
+    
+    Args:
+        sls_frame: SLS iframe对象
+        pid: 客户PID（用于日志）
+        time_range: 时间范围（用于日志）
+    """
+    logger.log_section("步骤6: 打印SLS iframe中的所有元素（用于判断查询条件和输出内容）")
+    
+    try:
+        elements = await sls_frame.evaluate(_IFRAME_ELEMENTS_JS)
+    except Exception as e:
+        logger.error(f"  ✗ 打印元素时出错: {type(e).__name__} - {str(e)}")
+        return
+    
+    logger.info("\n【查询条件区域】")
+    filter_text_list = elements['filter_texts']
+    logger.info(f"  - 找到 {elements['filter_count']} 个筛选条件标签:")
+    for idx, text in enumerate(filter_text_list, 1):
+        logger.info(f"    {idx}. {text}")
+    
+    input_list = [f"type={inp['type']}, value={inp['value']}" for inp in elements['inputs']]
+    logger.info(f"\n  - 找到 {elements['input_count']} 个输入框:")
+    for idx, input_info in enumerate(input_list, 1):
+        logger.info(f"    {idx}. {input_info}")
+    
+    logger.info("\n【输出内容区域】")
+    logger.info(f"  - 找到 {elements['row_count']} 个表格行/行元素")
+    table_rows_content = [f"行 {idx}: {text}" for idx, text in enumerate(elements['rows'], 1)]
+    for row_content in table_rows_content[:10]:  # 前10行详细记录
+        logger.info(f"    {row_content}")
+    
+    logger.info(f"  - 找到 {elements['cell_count']} 个表格单元格")
+    table_cells_content = []
+    for cell in elements['cells']:
+        cell_content = f"单元格 {cell['index']}: {cell['text']}"
+        table_cells_content.append(cell_content)
+        if cell['index'] <= 20:  # 前20个单元格详细记录
+            logger.info(f"    {cell_content}")
+    
+    # 使用日志模块记录到专门的日志文件
+    logger.log_iframe_elements(
+        pid=pid,
+        time_range=time_range,
+        filter_texts=filter_text_list,
+        inputs=input_list,
+        table_rows_count=elements['row_count'],
+        table_cells_count=elements['cell_count'],
+        table_rows_content=table_rows_content,
+        table_cells_content=table_cells_content
+    )
+
+
 async def _select_time_range_only(
     page: Page,
     pid: Optional[str],
     time_range: str,
-    timeout: int
+    timeout: int,
+    only_first: bool = False
 ) -> Dict[str, any]:
     """
     只切换时间范围，不重新输入PID（内部函数）
@@ -469,17 +803,16 @@ async def _select_time_range_only(
         pid: 客户PID（用于日志和结果）
         time_range: 时间范围
         timeout: 操作超时时间
+        only_first: 是否在得到成功率后立即停止提取其余数据行
         
     Returns:
         Dict: 查询结果字典
     """
-    logger = get_logger('sms_success_rate')
-    
     try:
         # 获取SLS iframe（应该已经存在）
-        print(f"\n{'='*60}")
-        print(f"切换时间范围（{time_range}），PID已输入，从选择时间范围开始")
-        print(f"{'='*60}")
+        logger.info(f"\n{'='*60}")
+        logger.info(f"切换时间范围（{time_range}），PID已输入，从选择时间范围开始")
+        logger.info(f"{'='*60}")
         
         # 查找SLS iframe
         sls_frame = await _find_sls_iframe(page)
@@ -496,7 +829,7 @@ async def _select_time_range_only(
         
         # 从"按回车键触发搜索/选择"之后的流程开始
         # 即：直接选择时间范围（跳过输入PID和按回车键的步骤）
-        print(f"\n步骤: 选择时间范围（{time_range}）")
+        logger.info(f"\n步骤: 选择时间范围（{time_range}）")
         
         # 使用统一的时间范围选择函数（切换时间范围后需要重新获取iframe引用）
         success, sls_frame, error_msg = await _select_time_range(
@@ -514,27 +847,15 @@ async def _select_time_range_only(
             }
         
         # 等待数据加载并提取数据
-        print(f"\n步骤: 等待数据加载并提取成功率")
+        logger.info(f"\n步骤: 等待数据加载并提取成功率")
         
-        # 切换时间范围后，等待数据加载（简化等待逻辑，直接等待后提取数据）
-        print("  - 等待数据加载完成...")
-        await asyncio.sleep(3)  # 等待3秒让数据有时间加载
-        
-        # 重新获取sls_frame引用（切换时间范围后iframe可能重新加载）
-        current_sls_frame = await _find_sls_iframe(page)
-        
-        if not current_sls_frame:
-            return {
-                'success': False,
-                'success_rate': None,
-                'pid': pid,
-                'time_range': time_range,
-                'data': None,
-                'error': '未找到SLS iframe'
-            }
+        # _select_time_range 已在切换后重新获取iframe引用（找不到时已返回失败），直接复用，不再重复查找
+        # 数据请求已在选择时间范围时等待返回，这里只等待表格数据行渲染出来
+        logger.info("  - 等待表格数据渲染...")
+        await _wait_for_table_rows(sls_frame)
         
         # 使用统一的提取函数
-        extract_result = await _extract_table_data(current_sls_frame, pid, time_range)
+        extract_result = await _extract_table_data(sls_frame, pid, time_range, only_first)
         
         # 确定返回的数据和成功率
         all_data = extract_result['all_data']
@@ -587,7 +908,9 @@ async def query_sms_success_rate(
     pid: Optional[str] = None,
     time_range: str = '30天',
     timeout: int = 30000,
-    skip_pid_input: bool = False
+    skip_pid_input: bool = False,
+    only_first: bool = False,
+    coalesce: bool = False
 ) -> Dict[str, any]:
     """
     查询短信签名成功率
@@ -597,6 +920,10 @@ async def query_sms_success_rate(
         pid: 客户PID（如果不提供，则从环境变量 SMS_PID 读取）
         time_range: 时间范围，可选值：'当天', '本周', '一周', '上周', '30天'，默认为'30天'
         timeout: 操作超时时间（毫秒），默认30秒
+        only_first: 是否在得到成功率后立即返回，默认False。为True时不再处理其余数据行，
+                    data 只包含第一条可用的数据行（提供PID时为第一条PID匹配的行）
+        coalesce: 是否与其他调用方正在进行的相同查询合并，默认False。合并时本页面不会被导航和输入PID，
+                  只适用于调用后不再使用该页面的调用方；发起查询的调用方被取消时，等待方改为在自己的页面上查询
         
     Returns:
         Dict: 查询结果字典，包含以下字段：
@@ -629,19 +956,7 @@ async def query_sms_success_rate(
     """
     # 如果未提供pid，从环境变量读取
     if not pid:
-        try:
-            from config import SMS_PID
-            pid = SMS_PID
-            
-            if not pid:
-                return {
-                    'success': False,
-                    'success_rate': None,
-                    'pid': None,
-                    'data': None,
-                    'error': '客户PID未提供，请在函数参数中传入或在环境变量中配置 SMS_PID'
-                }
-        except ImportError:
+        if _config is None:
             return {
                 'success': False,
                 'success_rate': None,
@@ -649,70 +964,97 @@ async def query_sms_success_rate(
                 'data': None,
                 'error': '客户PID未提供，且无法从环境变量读取'
             }
+        
+        pid = _config.SMS_PID
+        
+        if not pid:
+            return {
+                'success': False,
+                'success_rate': None,
+                'pid': None,
+                'data': None,
+                'error': '客户PID未提供，请在函数参数中传入或在环境变量中配置 SMS_PID'
+            }
     
+    # 切换时间范围依赖当前页面中已输入的PID，调用方之后还要使用本页面时也不参与合并
+    if skip_pid_input or not coalesce:
+        return await _query_sms_success_rate(page, pid, time_range, timeout, skip_pid_input, only_first)
+    
+    # 同一PID和时间范围已有查询在进行时，直接等待其结果，不再重复打开页面查询
+    key = (pid, time_range, only_first)
+    inflight = _INFLIGHT_QUERIES.get(key)
+    if inflight is not None:
+        logger.info(f"PID: {pid}（{time_range}）已有相同查询在进行，等待其结果...")
+        try:
+            # shield: 等待方被取消时不影响正在进行的查询
+            return _copy_result(await asyncio.shield(inflight))
+        except asyncio.CancelledError:
+            if not inflight.cancelled():
+                raise
+            # 发起方被取消，查询随之停止（其页面可能已被关闭），改为在本页面上查询
+            logger.info(f"PID: {pid}（{time_range}）合并的查询已取消，改为在当前页面查询...")
+            return await _query_sms_success_rate(page, pid, time_range, timeout, skip_pid_input, only_first)
+    
+    task = asyncio.ensure_future(
+        _query_sms_success_rate(page, pid, time_range, timeout, skip_pid_input, only_first)
+    )
+    _INFLIGHT_QUERIES[key] = task
+    task.add_done_callback(lambda _: _INFLIGHT_QUERIES.pop(key, None))
+    # 查询使用发起方的页面：发起方被取消时查询一并取消，避免调用方关闭页面后查询仍在操作该页面
+    return _copy_result(await task)
+
+
+def _copy_result(result: Dict[str, any]) -> Dict[str, any]:
+    """复制合并查询的结果（数据行列表及每行字典也复制），各调用方修改结果时互不影响"""
+    result = dict(result)
+    if result.get('data'):
+        result['data'] = [dict(row) for row in result['data']]
+    return result
+
+
+async def _query_sms_success_rate(
+    page: Page,
+    pid: str,
+    time_range: str,
+    timeout: int,
+    skip_pid_input: bool,
+    only_first: bool = False
+) -> Dict[str, any]:
+    """query_sms_success_rate 的实际查询流程（pid 已解析，参数含义同 query_sms_success_rate）"""
     try:
         # 如果跳过PID输入，说明已经输入过PID，只需要切换时间范围
         if skip_pid_input:
-            return await _select_time_range_only(page, pid, time_range, timeout)
+            return await _select_time_range_only(page, pid, time_range, timeout, only_first)
         
-        # 1. 导航到查询页面
-        print(f"正在访问成功率查询页面: {SUCCESS_RATE_QUERY_URL}")
-        await page.goto(SUCCESS_RATE_QUERY_URL, timeout=timeout, wait_until='domcontentloaded')
+        # 1. 导航到查询页面（导航提交后即返回，页面是否就绪以下一步等待菜单项可见为准）
+        logger.info(f"正在访问成功率查询页面: {SUCCESS_RATE_QUERY_URL}")
+        await page.goto(SUCCESS_RATE_QUERY_URL, timeout=timeout, wait_until='commit')
         
         # 2. 点击"求德大盘"菜单项
-        print("正在点击'求德大盘'菜单项...")
+        logger.info("正在点击'求德大盘'菜单项...")
         try:
-            menu_item = await page.wait_for_selector(
-                SELECTORS['success_rate_menu_item'],
-                timeout=10000,
-                state='visible'
-            )
-            await menu_item.click()
-            print("已点击'求德大盘'菜单项")
-            await asyncio.sleep(2)  # 等待页面切换/加载
+            # Locator.click 自动等待菜单项可见且可点击，不再先取 ElementHandle 再点击
+            await page.locator(SELECTORS['success_rate_menu_item']).first.click(timeout=10000)
+            logger.info("已点击'求德大盘'菜单项")
         except PlaywrightTimeoutError:
             try:
-                menu_item = await page.locator('text=求德大盘').first
+                menu_item = page.locator('text=求德大盘').first
                 if await menu_item.is_visible():
                     await menu_item.click()
-                    print("已点击'求德大盘'菜单项（通过文本定位）")
-                    await asyncio.sleep(2)
+                    logger.info("已点击'求德大盘'菜单项（通过文本定位）")
                 else:
-                    print("警告: 未找到'求德大盘'菜单项，继续执行...")
+                    logger.warning("警告: 未找到'求德大盘'菜单项，继续执行...")
             except Exception as e:
-                print(f"点击'求德大盘'菜单项时出现问题: {e}，继续执行...")
+                logger.warning(f"点击'求德大盘'菜单项时出现问题: {e}，继续执行...")
         
         # 3. 等待页面加载完成，查找PID输入框
-        print(f"\n{'='*60}")
-        print(f"步骤3: 查找并填写客户PID: {pid}")
-        print(f"{'='*60}")
-        
-        # 等待页面完全加载
-        print("\n等待页面完全加载...")
-        await asyncio.sleep(3)
-        
-        # 检查是否有iframe
-        print("检查页面中是否有iframe...")
-        iframes = page.frames
-        # print(f"  - 找到 {len(iframes)} 个frame（包括主frame）")
-        # for idx, frame in enumerate(iframes):
-        #     url = frame.url
-        #     name = frame.name or 'unnamed'
-        #     url_display = url[:100] + '...' if len(url) > 100 else url
-        #     print(f"    Frame {idx}: name='{name}', url='{url_display}'")
-        
-        # 直接定位到Frame 3（SLS iframe）
-        print("\n定位SLS iframe (Frame 3)...")
-        sls_frame = await _find_sls_iframe(page)
-        if sls_frame:
-            # 找到iframe后，打印信息
-            iframes = page.frames
-            for idx, frame in enumerate(iframes):
-                if frame == sls_frame:
-                    print(f"  ✓ 找到SLS iframe: Frame {idx}")
-                    print(f"    URL: {frame.url[:150]}...")
-                    break
+        logger.info(f"\n{'='*60}")
+        logger.info(f"步骤3: 查找并填写客户PID: {pid}")
+        logger.info(f"{'='*60}")
         
+        # 等待SLS iframe出现（替代固定等待页面切换和加载；按 URL 匹配，不再逐个枚举并打印所有frame）
+        logger.info("\n定位SLS iframe...")
+        sls_frame = await _wait_for_sls_iframe(page, timeout=timeout)
         if not sls_frame:
             return {
                 'success': False,
@@ -721,6 +1063,8 @@ async def query_sms_success_rate(
                 'data': None,
                 'error': '未找到SLS iframe (Frame 3)，请检查页面是否加载完成'
             }
+        logger.info("  ✓ 找到SLS iframe")
+        logger.debug(f"    URL: {sls_frame.url[:150]}...")
         
         # 等待SLS iframe加载完成（使用统一的等待函数）
         await _wait_for_iframe_load(sls_frame)
@@ -728,148 +1072,101 @@ async def query_sms_success_rate(
         # 在SLS iframe中查找PID输入框
         pid_input_locator = None
         
-        print("\n[方式1] 在SLS iframe中查找PID输入框...")
+        logger.info("\n[方式1] 在SLS iframe中查找PID输入框...")
         try:
             # 在SLS iframe中查找pid标签
             pid_label_locator = sls_frame.locator('span.obviz-base-filterText').filter(has_text='pid')
             count = await pid_label_locator.count()
-            print(f"  - 找到 {count} 个pid标签")
+            logger.info(f"  - 找到 {count} 个pid标签")
             
             if count > 0:
                 # 找到pid标签后，查找父容器
                 container_locator = pid_label_locator.locator('xpath=ancestor::div[contains(@class, "obviz-base-easy-select-inner")]')
                 container_count = await container_locator.count()
-                print(f"    - 找到 {container_count} 个父容器")
+                logger.debug(f"    - 找到 {container_count} 个父容器")
                 
                 if container_count > 0:
-                    # 先尝试查找已存在的可见输入框
+                    # 先尝试查找已存在的可见输入框（is_visible 在没有输入框时返回 False，无需先 count）
                     input_locator = container_locator.locator('span.obviz-base-filterInput input[autocomplete="off"]')
-                    input_count = await input_locator.count()
-                    print(f"    - 在容器内找到 {input_count} 个输入框")
+                    first_input = input_locator.first
+                    is_visible = await first_input.is_visible()
+                    logger.debug(f"    - 容器内第一个输入框: 可见={is_visible}")
                     
-                    if input_count > 0:
-                        # 检查第一个输入框是否可见
-                        first_input = input_locator.first
-                        is_visible = await first_input.is_visible()
-                        value = await first_input.get_attribute('value') or ''
-                        print(f"    - 第一个输入框: 可见={is_visible}, 当前值='{value}'")
-                        
-                        if is_visible:
-                            pid_input_locator = first_input
-                            print(f"  ✓ 在SLS iframe中找到PID输入框（已可见）")
+                    if is_visible:
+                        pid_input_locator = first_input
+                        logger.info(f"  ✓ 在SLS iframe中找到PID输入框（已可见）")
                     
                     # 如果输入框不可见或不存在，尝试点击值容器来激活
                     if not pid_input_locator:
-                        print(f"    - 输入框不可见或不存在，尝试点击值容器激活...")
+                        logger.debug(f"    - 输入框不可见或不存在，尝试点击值容器激活...")
                         try:
-                            # 尝试多种值容器选择器
-                            value_container_selectors = [
-                                'div.obviz-base-easy-select-value',
-                                'div.obviz-base-easy-select-text-field',
-                                '.obviz-base-easy-select-value',
-                                '.obviz-base-easy-select-text-field',
-                                'div[class*="easy-select-value"]',
-                                'div[class*="easy-select-text"]'
-                            ]
-                            
+                            # 所有候选选择器在页面内一次判断，返回第一个可见的值容器选择器
                             value_container = None
-                            for selector in value_container_selectors:
-                                try:
-                                    value_locator = container_locator.locator(selector).first
-                                    if await value_locator.count() > 0:
-                                        is_visible = await value_locator.is_visible()
-                                        if is_visible:
-                                            value_container = value_locator
-                                            print(f"    - 找到值容器: {selector}")
-                                            break
-                                except Exception:
-                                    continue
+                            selector = await container_locator.evaluate_all(
+                                _FIND_VISIBLE_SELECTOR_JS, _VALUE_CONTAINER_SELECTORS
+                            )
+                            if selector:
+                                value_container = container_locator.locator(selector).first
+                                logger.debug(f"    - 找到值容器: {selector}")
                             
                             if value_container:
                                 # 点击值容器来激活输入框
-                                print(f"    - 点击值容器激活输入框...")
+                                logger.debug(f"    - 点击值容器激活输入框...")
                                 await value_container.click()
-                                await asyncio.sleep(1)  # 等待输入框出现
-                                
-                                # 再次查找输入框
-                                input_locator = container_locator.locator('span.obviz-base-filterInput input[autocomplete="off"]')
-                                input_count = await input_locator.count()
-                                print(f"    - 点击后找到 {input_count} 个输入框")
-                                
-                                if input_count > 0:
-                                    first_input = input_locator.first
-                                    is_visible = await first_input.is_visible()
-                                    if is_visible:
-                                        pid_input_locator = first_input
-                                        print(f"  ✓ 在SLS iframe中找到PID输入框（已激活）")
-                                    else:
-                                        try:
-                                            await first_input.wait_for(state='visible', timeout=3000)
-                                            pid_input_locator = first_input
-                                            print(f"  ✓ 在SLS iframe中找到PID输入框（等待后可见）")
-                                        except Exception:
-                                            print(f"    - 等待超时，输入框仍未可见")
+                                activated_by = "已激活"
                             else:
                                 # 如果找不到值容器，尝试直接点击容器
-                                print(f"    - 未找到值容器，尝试点击整个容器...")
+                                logger.debug(f"    - 未找到值容器，尝试点击整个容器...")
                                 await container_locator.first.click()
-                                await asyncio.sleep(1)
-                                
-                                # 再次查找输入框
-                                input_locator = container_locator.locator('span.obviz-base-filterInput input[autocomplete="off"]')
-                                input_count = await input_locator.count()
-                                if input_count > 0:
-                                    first_input = input_locator.first
-                                    try:
-                                        await first_input.wait_for(state='visible', timeout=3000)
-                                        pid_input_locator = first_input
-                                        print(f"  ✓ 在SLS iframe中找到PID输入框（点击容器后可见）")
-                                    except Exception:
-                                        pass
+                                activated_by = "点击容器后可见"
+                            
+                            # 等待输入框出现并可见（出现即继续，不再固定等待1秒后再查找）
+                            first_input = input_locator.first
+                            try:
+                                await first_input.wait_for(state='visible', timeout=3000)
+                                pid_input_locator = first_input
+                                logger.info(f"  ✓ 在SLS iframe中找到PID输入框（{activated_by}）")
+                            except PlaywrightTimeoutError:
+                                logger.debug(f"    - 等待超时，输入框仍未可见")
                         except Exception as e:
-                            print(f"    - 激活输入框时出错: {type(e).__name__} - {str(e)}")
+                            logger.warning(f"    - 激活输入框时出错: {type(e).__name__} - {str(e)}")
             else:
-                print(f"  ✗ 未找到pid标签")
+                logger.warning(f"  ✗ 未找到pid标签")
         except Exception as e:
-            print(f"  ✗ 查找PID输入框失败: {type(e).__name__} - {str(e)}")
+            logger.warning(f"  ✗ 查找PID输入框失败: {type(e).__name__} - {str(e)}")
         
         # 方式2: 如果方式1失败，在SLS iframe中查找所有输入框并验证
-        if not pid_input_locator:
-            print("\n[方式2] 在SLS iframe中查找所有输入框并验证...")
+        if pid_input_locator:
+            logger.info("\n[方式2] 跳过（方式1已成功）")
         else:
-            print("\n[方式2] 跳过（方式1已成功）")
+            logger.info("\n[方式2] 在SLS iframe中查找所有输入框并验证...")
             try:
                 all_inputs_locator = sls_frame.locator('span.obviz-base-filterInput input[autocomplete="off"]')
                 count = await all_inputs_locator.count()
-                print(f"  - 找到 {count} 个输入框")
+                logger.info(f"  - 找到 {count} 个输入框")
                 
                 for inp_idx in range(count):
                     input_loc = all_inputs_locator.nth(inp_idx)
                     is_visible = await input_loc.is_visible()
                     if is_visible:
                         value = await input_loc.get_attribute('value') or ''
-                        print(f"    - 输入框 {inp_idx+1}: 可见={is_visible}, 值='{value}'")
+                        logger.debug(f"    - 输入框 {inp_idx+1}: 可见={is_visible}, 值='{value}'")
                         
                         # 检查是否在pid容器内
-                        is_pid_input = await input_loc.evaluate('''el => {
-                            const container = el.closest("div.obviz-base-easy-select-inner");
-                            if (!container) return false;
-                            const pidLabel = container.querySelector('span.obviz-base-filterText');
-                            return pidLabel && pidLabel.textContent.trim().toLowerCase() === 'pid';
-                        }''')
-                        print(f"      - 检查结果: {is_pid_input}")
+                        is_pid_input = await input_loc.evaluate(_IS_PID_INPUT_JS)
+                        logger.debug(f"      - 检查结果: {is_pid_input}")
                         
                         if is_pid_input:
                             pid_input_locator = input_loc
-                            print(f"  ✓ 在SLS iframe的输入框 {inp_idx+1}中找到PID输入框")
+                            logger.info(f"  ✓ 在SLS iframe的输入框 {inp_idx+1}中找到PID输入框")
                             break
             except Exception as e:
-                print(f"  ✗ 查找失败: {type(e).__name__} - {str(e)}")
+                logger.warning(f"  ✗ 查找失败: {type(e).__name__} - {str(e)}")
         
         # 最终检查
-        print(f"\n{'='*60}")
+        logger.info(f"\n{'='*60}")
         if not pid_input_locator:
-            print("✗ 所有方式都未能找到PID输入框")
+            logger.warning("✗ 所有方式都未能找到PID输入框")
             return {
                 'success': False,
                 'success_rate': None,
@@ -878,77 +1175,66 @@ async def query_sms_success_rate(
                 'error': '未找到PID输入框，请检查页面结构'
             }
         else:
-            print(f"✓ PID输入框定位成功 (在SLS iframe中)")
-            print(f"{'='*60}\n")
+            logger.info(f"✓ PID输入框定位成功 (在SLS iframe中)")
+            logger.info(f"{'='*60}\n")
             # 方式1已成功，跳过方式2
         
         # 4. 填写PID（在SLS iframe中填写）
-        print(f"\n{'='*60}")
-        print(f"步骤4: 填写PID到输入框")
-        print(f"{'='*60}")
+        logger.info(f"\n{'='*60}")
+        logger.info(f"步骤4: 填写PID到输入框")
+        logger.info(f"{'='*60}")
         
         try:
-            print("  - 点击输入框获取焦点...")
+            logger.info("  - 点击输入框获取焦点...")
             await pid_input_locator.click()
-            await asyncio.sleep(0.3)
             
-            print("  - 清空输入框...")
-            await pid_input_locator.clear()
-            await asyncio.sleep(0.2)
-            
-            print(f"  - 填写PID: {pid}...")
+            # fill 会先清空输入框再填写，无需单独 clear
+            logger.info(f"  - 填写PID: {pid}...")
             await pid_input_locator.fill(pid)
-            await asyncio.sleep(0.5)
             
-            # 验证输入
-            value_after = await pid_input_locator.get_attribute('value') or ''
-            print(f"  - 填写后值: '{value_after}'")
+            # 验证输入（值一致即继续，不再固定等待）
+            value_after = await _wait_for_value(pid_input_locator, pid)
+            logger.info(f"  - 填写后值: '{value_after}'")
             
             if value_after != pid:
-                print("  - 值不匹配，尝试使用JavaScript直接设置...")
-                await pid_input_locator.evaluate(f'''el => {{
-                    el.value = "{pid}";
-                    el.dispatchEvent(new Event('input', {{ bubbles: true }}));
-                    el.dispatchEvent(new Event('change', {{ bubbles: true }}));
-                }}''')
-                await asyncio.sleep(0.5)
-                value_after = await pid_input_locator.get_attribute('value') or ''
-                print(f"  - JavaScript设置后值: '{value_after}'")
+                logger.info("  - 值不匹配，尝试使用JavaScript直接设置...")
+                await pid_input_locator.evaluate(_SET_INPUT_VALUE_JS, pid)
+                value_after = await _wait_for_value(pid_input_locator, pid)
+                logger.info(f"  - JavaScript设置后值: '{value_after}'")
             
             # 如果还是不行，尝试逐字符输入
             if value_after != pid:
-                print("  - 尝试逐字符输入...")
+                logger.info("  - 尝试逐字符输入...")
                 await pid_input_locator.click()
                 await pid_input_locator.clear()
-                await asyncio.sleep(0.2)
                 await pid_input_locator.type(pid, delay=50)
-                await asyncio.sleep(0.5)
-                value_after = await pid_input_locator.get_attribute('value') or ''
-                print(f"  - 逐字符输入后值: '{value_after}'")
+                value_after = await _wait_for_value(pid_input_locator, pid)
+                logger.info(f"  - 逐字符输入后值: '{value_after}'")
             
             if value_after == pid:
-                print(f"  ✓ PID填写成功！当前值: '{value_after}'")
+                logger.info(f"  ✓ PID填写成功！当前值: '{value_after}'")
             else:
-                print(f"  ⚠ PID填写可能不完整，期望: '{pid}', 实际: '{value_after}'")
+                logger.warning(f"  ⚠ PID填写可能不完整，期望: '{pid}', 实际: '{value_after}'")
             
         except Exception as e:
-            print(f"  ✗ 填写PID时出错: {type(e).__name__} - {str(e)}")
+            logger.warning(f"  ✗ 填写PID时出错: {type(e).__name__} - {str(e)}")
         
         # 触发搜索/选择
-        print("\n  - 尝试触发搜索/选择...")
+        logger.info("\n  - 尝试触发搜索/选择...")
         try:
             await pid_input_locator.press('Enter')
-            await asyncio.sleep(1)
-            print("  ✓ 已按回车键")
+            # 等待回车触发的请求完成（空闲即继续，最长仍为原来的1秒）
+            await wait_for_xhr_idle(sls_frame, timeout=1000, fallback_delay=1)
+            logger.info("  ✓ 已按回车键")
         except Exception as e:
-            print(f"  - 按回车键失败: {e}")
+            logger.warning(f"  - 按回车键失败: {e}")
         
-        print(f"{'='*60}\n")
+        logger.info(f"{'='*60}\n")
         
         # 5. 选择时间范围
-        print(f"\n{'='*60}")
-        print(f"步骤5: 选择时间范围（{time_range}）")
-        print(f"{'='*60}")
+        logger.info(f"\n{'='*60}")
+        logger.info(f"步骤5: 选择时间范围（{time_range}）")
+        logger.info(f"{'='*60}")
         
         # 使用统一的时间范围选择函数（首次查询不需要重新获取iframe引用）
         success, sls_frame, error_msg = await _select_time_range(
@@ -956,107 +1242,24 @@ async def query_sms_success_rate(
         )
         
         if not success:
-            print(f"  ✗ {error_msg}")
-        
-        print(f"{'='*60}\n")
-        
-        # 6. 打印SLS iframe中的所有元素（用于调试）
-        # logger = get_logger('sms_success_rate')
-        # logger.log_section("步骤6: 打印SLS iframe中的所有元素（用于判断查询条件和输出内容）")
-        # 
-        # try:
-        #     logger.info("\n【查询条件区域】")
-        #     
-        #     filter_texts = await sls_frame.query_selector_all('span.obviz-base-filterText')
-        #     filter_text_list = []
-        #     logger.info(f"  - 找到 {len(filter_texts)} 个筛选条件标签:")
-        #     for idx, filter_text in enumerate(filter_texts[:20], 1):
-        #         try:
-        #             text = await filter_text.inner_text()
-        #             logger.info(f"    {idx}. {text}")
-        #             filter_text_list.append(text)
-        #         except Exception:
-        #             pass
-        #     
-        #     inputs = await sls_frame.query_selector_all('input')
-        #     input_list = []
-        #     logger.info(f"\n  - 找到 {len(inputs)} 个输入框:")
-        #     for idx, inp in enumerate(inputs[:20], 1):
-        #         try:
-        #             input_type = await inp.get_attribute('type') or 'text'
-        #             input_value = await inp.get_attribute('value') or ''
-        #             input_info = f"type={input_type}, value={input_value[:50]}"
-        #             logger.info(f"    {idx}. {input_info}")
-        #             input_list.append(input_info)
-        #         except Exception:
-        #             pass
-        #     
-        #     logger.info("\n【输出内容区域】")
-        #     
-        #     # 查找表格行元素，支持多种表格实现方式
-        #     # - div.obviz-base-easyTable-row: 主要用于新版SLS前端的表格行
-        #     # - tr: 标准HTML表格行
-        #     # - div[class*="table"]: 匹配部分自定义类名含'table'的行元素，兼容不同产品线UI组件
-        #     # 这里的 div[class*="table"] 选择器表示：选择 class 属性中包含 "table" 字符串的所有 div 元素
-        #     # 这用于匹配自定义样式表格行，包括 class="custom-table-row"、class="main-table" 等。
-        #     table_rows = await sls_frame.query_selector_all(
-        #         'div.obviz-base-easyTable-row, tr, div[class*="table"]'
-        #     )
-        #     table_rows_count = len(table_rows)
-        #     logger.info(f"  - 找到 {table_rows_count} 个表格行/行元素（"表格元素"是指表格的每一行，包括可能的tr、div或自定义行元素）")
-        #     
-        #     # 提取表格行的具体内容
-        #     table_rows_content = []
-        #     for idx, row in enumerate(table_rows[:50], 1):  # 限制最多50行，避免日志过大
-        #         try:
-        #             row_text = await row.inner_text()
-        #             table_rows_content.append(f"行 {idx}: {row_text[:200]}")  # 限制每行200字符
-        #             if idx <= 10:  # 前10行详细记录
-        #                 logger.info(f"    行 {idx}: {row_text[:200]}")
-        #         except Exception as e:
-        #             table_rows_content.append(f"行 {idx}: [提取失败: {str(e)}]")
-        #     
-        #     table_cells = await sls_frame.query_selector_all('div.obviz-base-easyTable-cell, td, div[class*="table-cell"]')
-        #     table_cells_count = len(table_cells)
-        #     logger.info(f"  - 找到 {table_cells_count} 个表格单元格")
-        #     
-        #     # 提取表格单元格的具体内容
-        #     table_cells_content = []
-        #     for idx, cell in enumerate(table_cells[:100], 1):  # 限制最多100个单元格
-        #         try:
-        #             cell_text = await extract_cell_text(cell)
-        #             if cell_text.strip():  # 只记录非空单元格
-        #                 table_cells_content.append(f"单元格 {idx}: {cell_text.strip()[:100]}")  # 限制每个单元格100字符
-        #                 if idx <= 20:  # 前20个单元格详细记录
-        #                     logger.info(f"    单元格 {idx}: {cell_text.strip()[:100]}")
-        #         except Exception as e:
-        #             table_cells_content.append(f"单元格 {idx}: [提取失败: {str(e)}]")
-        #     
-        #     # 使用日志模块记录到专门的日志文件
-        #     log_file = logger.log_iframe_elements(
-        #         pid=pid,
-        #         time_range=time_range,
-        #         filter_texts=filter_text_list,
-        #         inputs=input_list,
-        #         table_rows_count=table_rows_count,
-        #         table_cells_count=table_cells_count,
-        #         table_rows_content=table_rows_content,
-        #         table_cells_content=table_cells_content
-        #     )
-        #         
-        # except Exception as e:
-        #     logger.error(f"  ✗ 打印元素时出错: {type(e).__name__} - {str(e)}")
-        
-        print(f"\n{'='*60}")
-        print(f"步骤7: 等待数据加载并提取成功率")
-        print(f"{'='*60}")
-        
-        # 7. 等待数据加载完成（简化等待逻辑，直接等待后提取数据）
-        print("  - 等待数据加载完成...")
-        await asyncio.sleep(3)  # 等待3秒让数据有时间加载
+            logger.warning(f"  ✗ {error_msg}")
+        
+        logger.info(f"{'='*60}\n")
+        
+        # 6. 打印SLS iframe中的所有元素（用于调试，仅在配置 SMS_DEBUG 时执行）
+        if _config is not None and _config.SMS_DEBUG:
+            await _log_iframe_elements(sls_frame, pid, time_range)
+        
+        logger.info(f"\n{'='*60}")
+        logger.info(f"步骤7: 等待数据加载并提取成功率")
+        logger.info(f"{'='*60}")
+        
+        # 7. 数据请求已在选择时间范围时等待返回，这里只等待表格数据行渲染出来
+        logger.info("  - 等待表格数据渲染...")
+        await _wait_for_table_rows(sls_frame)
         
         # 8. 从表格中提取数据（使用统一的提取函数）
-        extract_result = await _extract_table_data(sls_frame, pid, time_range)
+        extract_result = await _extract_table_data(sls_frame, pid, time_range, only_first)
         
         # 确定返回的数据和成功率
         all_data = extract_result['all_data']
@@ -1097,7 +1300,7 @@ async def query_sms_success_rate(
             
     except PlaywrightTimeoutError as e:
         error_msg = f"操作超时（超过 {timeout/1000} 秒）: {str(e)}"
-        print(f"错误: {error_msg}")
+        logger.error(f"错误: {error_msg}")
         return {
             'success': False,
             'success_rate': None,
@@ -1108,7 +1311,7 @@ async def query_sms_success_rate(
         }
     except Exception as e:
         error_msg = f"查询过程中发生错误: {str(e)}"
-        print(f"错误: {error_msg}")
+        logger.error(f"错误: {error_msg}")
         return {
             'success': False,
             'success_rate': None,
@@ -1119,11 +1322,62 @@ async def query_sms_success_rate(
         }
 
 
+async def _query_time_ranges_parallel(
+    page: Page,
+    pid: Optional[str],
+    time_ranges: list,
+    timeout: int,
+    all_results: Dict[str, any],
+    logger
+) -> Dict[str, any]:
+    """
+    在同一浏览器上下文的多个页面中并发查询各时间范围（内部函数）
+    
+    Args:
+        page: Playwright Page 对象（用于获取浏览器上下文）
+        pid: 客户PID
+        time_ranges: 时间范围列表
+        timeout: 操作超时时间
+        all_results: 汇总结果字典（原地填充）
+        logger: 日志记录器
+        
+    Returns:
+        Dict: 汇总结果字典
+    """
+    logger.info(f"\n{'='*60}")
+    logger.info(f"并发查询PID: {pid} 的短信签名成功率，时间范围: {', '.join(time_ranges)}")
+    logger.info(f"{'='*60}")
+    
+    # 页面逐个打开并记录，某个页面打开失败时 finally 中关闭已打开的页面
+    pages = []
+    try:
+        for _ in time_ranges:
+            pages.append(await page.context.new_page())
+        results = await asyncio.gather(*(
+            query_sms_success_rate(p, pid, tr, timeout) for p, tr in zip(pages, time_ranges)
+        ))
+    finally:
+        await asyncio.gather(*(p.close() for p in pages), return_exceptions=True)
+    
+    for tr, result in zip(time_ranges, results):
+        all_results['results'][tr] = result
+        if not result['success']:
+            all_results['success'] = False
+            if all_results['error'] is None:
+                all_results['error'] = f"时间范围 {tr} 查询失败: {result.get('error', '未知错误')}"
+            logger.error(f"  ✗ 时间范围 {tr} 查询失败: {result.get('error', '未知错误')}")
+        else:
+            logger.info(f"  ✓ 时间范围 {tr} 查询成功！")
+    
+    return all_results
+
+
 async def query_sms_success_rate_multi(
     page: Page,
     pid: Optional[str] = None,
     time_ranges: Optional[list] = None,
-    timeout: int = 30000
+    timeout: int = 30000,
+    parallel: bool = False
 ) -> Dict[str, any]:
     """
     查询多个时间范围的短信签名成功率
@@ -1134,6 +1388,8 @@ async def query_sms_success_rate_multi(
         time_ranges: 时间范围列表，可选值：'当天', '本周', '一周', '上周', '30天'
                      如果不提供，默认查询：['当天', '一周', '本周', '30天']
         timeout: 操作超时时间（毫秒），默认30秒
+        parallel: 是否并发查询。为True时在同一浏览器上下文中为每个时间范围新建页面，
+                  各自执行完整查询流程（共享登录状态），总耗时取决于最慢的一次查询
         
     Returns:
         Dict: 查询结果字典，包含以下字段：
@@ -1156,13 +1412,19 @@ async def query_sms_success_rate_multi(
         'error': None
     }
     
+    if parallel:
+        return await _query_time_ranges_parallel(page, pid, time_ranges, timeout, all_results, logger)
+    
     # 第一次查询：完整流程（包括输入PID）
     first_time_range = time_ranges[0]
     logger.info(f"\n{'='*60}")
     logger.info(f"开始查询PID: {pid} 的短信签名成功率，时间范围: {first_time_range}（首次查询，将输入PID）")
     logger.info(f"{'='*60}")
     
-    first_result = await query_sms_success_rate(page, pid, first_time_range, timeout, skip_pid_input=False)
+    # 后续查询依赖本页面中已输入的PID，首次查询必须在本页面上执行，不与其他调用方合并
+    first_result = await query_sms_success_rate(
+        page, pid, first_time_range, timeout, skip_pid_input=False, coalesce=False
+    )
     all_results['results'][first_time_range] = first_result
     
     if not first_result['success']:
@@ -1192,3 +1454,46 @@ async def query_sms_success_rate_multi(
             logger.info(f"  ✓ 时间范围 {tr} 查询成功！")
     
     return all_results
+
+
+async def query_sms_signature_and_success_rate(
+    context: BrowserContext,
+    pid: Optional[str] = None,
+    sign_name: Optional[str] = None,
+    time_range: str = '30天',
+    timeout: int = 30000
+) -> Dict[str, Dict[str, any]]:
+    """
+    在同一浏览器上下文的两个页面中同时查询短信签名（工单号）和签名成功率
+    
+    两个查询访问不同的页面、互不依赖，并发执行时总耗时约为两者中较慢的一个，而不是两者之和
+    
+    Args:
+        context: Playwright BrowserContext 对象（需要已登录的会话，如 get_page() 返回页面的 page.context）
+        pid: 客户PID（如果不提供，则从环境变量 SMS_PID 读取）
+        sign_name: 签名名称（如果不提供，则从环境变量 SMS_SIGN_NAME 读取）
+        time_range: 成功率查询的时间范围，默认为'30天'
+        timeout: 单次查询的操作超时时间（毫秒），默认30秒
+        
+    Returns:
+        Dict: 查询结果字典，包含以下字段：
+            - signature (Dict): 签名查询结果，格式同 query_sms_signature 的返回值
+            - success_rate (Dict): 成功率查询结果，格式同 query_sms_success_rate 的返回值
+    """
+    # 页面逐个打开并记录，第二个页面打开失败时 finally 中关闭已打开的页面
+    pages = []
+    try:
+        for _ in range(2):
+            pages.append(await context.new_page())
+        signature_page, success_rate_page = pages
+        signature_result, success_rate_result = await asyncio.gather(
+            query_sms_signature(signature_page, pid, sign_name, timeout),
+            query_sms_success_rate(success_rate_page, pid, time_range, timeout)
+        )
+    finally:
+        await asyncio.gather(*(p.close() for p in pages), return_exceptions=True)
+    
+    return {
+        'signature': signature_result,
+        'success_rate': success_rate_result
+    }